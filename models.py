@@ -1,13 +1,133 @@
 """
 Data models for the shift scheduling system.
 """
+import sys
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict
-from datetime import datetime, time, timedelta
-from enum import Enum
+from typing import List, Optional, Dict, Set, Iterable
+from datetime import date, datetime, time
+from enum import IntEnum
 
 
-class DayOfWeek(Enum):
+SECONDS_PER_DAY = 24 * 3600
+
+# dataclass(slots=True) needs Python 3.10+; older interpreters just keep a __dict__
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Employee fields whose cached lookups are rebuilt when reassigned
+_LOOKUP_FIELDS = frozenset({
+    'preferred_days', 'unavailable_days', 'preferred_start_time', 'preferred_end_time',
+    'preferred_times_by_day', 'available_times_by_day', 'unavailable_times_by_day',
+    'preferred_dates', 'preferred_times_by_date',
+    'unavailable_dates', 'unavailable_times_by_date', 'available_times_by_date',
+})
+
+# Date-keyed Employee fields, stored keyed by plain dates whenever they are assigned
+_DATE_SET_FIELDS = frozenset({'preferred_dates', 'unavailable_dates'})
+_DATE_DICT_FIELDS = frozenset({'preferred_times_by_date', 'unavailable_times_by_date', 'available_times_by_date'})
+
+
+def _to_date(value) -> date:
+    """Reduce a datetime (or date) to a plain date for use as a lookup key."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _time_to_seconds(time_obj: time) -> int:
+    """Convert a time of day to whole seconds since midnight."""
+    return time_obj.hour * 3600 + time_obj.minute * 60 + time_obj.second
+
+
+def _ranges_to_seconds(times) -> Optional[tuple]:
+    """
+    Convert a (start, end) time tuple, or a list of them, to fused ranges in seconds since midnight.
+    
+    An end before its start is carried past midnight, ranges are sorted by start and
+    overlapping or touching ranges are merged, so each rule holds the fewest ranges
+    possible. None passes through.
+    """
+    if not times:
+        return None
+    if isinstance(times[0], time):
+        times = (times,)
+    ranges = []
+    for start, end in sorted((_time_to_seconds(s), _time_to_seconds(e)) for s, e in times):
+        if end < start:
+            end += SECONDS_PER_DAY
+        if ranges and start <= ranges[-1][1]:
+            if end > ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return tuple(ranges)
+
+
+def _check_available(start: int, end: int, unavailable_all_day: bool,
+                     unavail_ranges: Optional[tuple], avail_ranges: Optional[tuple]) -> bool:
+    """Apply a resolved availability rule to a range in seconds since midnight."""
+    if end < start:
+        end += SECONDS_PER_DAY
+    if unavail_ranges is None:
+        if unavailable_all_day:
+            return False
+    else:
+        for range_start, range_end in unavail_ranges:
+            if range_start >= end:
+                break  # ranges are sorted, nothing later can overlap
+            if start < range_end:
+                return False
+    if avail_ranges is not None:
+        for range_start, range_end in avail_ranges:
+            if range_start > start:
+                break
+            if end <= range_end:
+                return True
+        return False
+    return True
+
+
+def check_availability(rule: tuple, start_time: time, end_time: time) -> bool:
+    """Check a time range against a rule returned by Employee.availability_rule."""
+    return _check_available(_time_to_seconds(start_time), _time_to_seconds(end_time), *rule)
+
+
+def check_availability_seconds(rule: tuple, start: int, end: int) -> bool:
+    """check_availability for a range already in whole seconds since midnight."""
+    return _check_available(start, end, *rule)
+
+
+def can_start_at(rule: tuple, start_time: time) -> bool:
+    """
+    Check whether any non-empty range starting at start_time could pass a rule from Employee.availability_rule.
+    
+    A False answer means check_availability fails for every end time after the start,
+    which lets a caller skip a start without trying durations.
+    """
+    return can_start_at_seconds(rule, _time_to_seconds(start_time))
+
+
+def can_start_at_seconds(rule: tuple, start: int) -> bool:
+    """can_start_at for a start already in whole seconds since midnight."""
+    unavailable_all_day, unavail_ranges, avail_ranges = rule
+    if unavail_ranges is None:
+        if unavailable_all_day:
+            return False
+    else:
+        for range_start, range_end in unavail_ranges:
+            if range_start > start:
+                break
+            if start < range_end:
+                return False
+    if avail_ranges is not None:
+        for range_start, range_end in avail_ranges:
+            if range_start > start:
+                break
+            if start < range_end:
+                return True
+        return False
+    return True
+
+
+class DayOfWeek(IntEnum):
     """Days of the week."""
     MONDAY = 0
     TUESDAY = 1
@@ -18,7 +138,7 @@ class DayOfWeek(Enum):
     SUNDAY = 6
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class TimeSlot:
     """Represents a time slot for a shift."""
     day: DayOfWeek
@@ -27,22 +147,25 @@ class TimeSlot:
     
     def duration_hours(self) -> float:
         """Calculate duration in hours."""
-        start = datetime.combine(datetime.today(), self.start_time)
-        end = datetime.combine(datetime.today(), self.end_time)
-        if end < start:
-            end += timedelta(days=1)
-        return (end - start).total_seconds() / 3600.0
+        delta = _time_to_seconds(self.end_time) - _time_to_seconds(self.start_time)
+        if delta < 0:
+            delta += SECONDS_PER_DAY
+        return delta / 3600.0
 
 
 @dataclass
 class StoreHours:
     """Store operating hours for each day of the week."""
     hours: Dict[DayOfWeek, tuple] = field(default_factory=dict)
-    date_overrides: Dict[datetime, Optional[tuple]] = field(default_factory=dict)
+    date_overrides: Dict[date, Optional[tuple]] = field(default_factory=dict)
     
-    def _normalize_date(self, date: datetime) -> datetime:
+    def __post_init__(self):
+        # Overrides are keyed by plain dates; accept datetimes from older callers
+        self.date_overrides = {_to_date(d): hours for d, hours in self.date_overrides.items()}
+    
+    def _normalize_date(self, date: datetime) -> date:
         """Normalize date to date-only (no time component)."""
-        return datetime(date.year, date.month, date.day)
+        return _to_date(date)
     
     def set_hours(self, day: DayOfWeek, open_time: time, close_time: time):
         """Set hours for a specific day of the week."""
@@ -62,22 +185,42 @@ class StoreHours:
         if date_only in self.date_overrides:
             del self.date_overrides[date_only]
     
-    def get_hours(self, day: DayOfWeek, date: Optional[datetime] = None) -> Optional[tuple]:
-        """Get hours for a specific day, checking date overrides first."""
-        if date:
+    def get_hours_for_day(self, day: DayOfWeek) -> Optional[tuple]:
+        """Get the regular hours for a day of the week, ignoring date overrides."""
+        return self.hours.get(day)
+    
+    def get_hours_with_override(self, day: DayOfWeek, date: datetime) -> Optional[tuple]:
+        """Get hours for a specific date, falling back to the day of week."""
+        if self.date_overrides:
             date_only = self._normalize_date(date)
             if date_only in self.date_overrides:
                 return self.date_overrides[date_only]
         return self.hours.get(day)
     
-    def is_open(self, day: DayOfWeek, date: Optional[datetime] = None) -> bool:
-        """Check if store is open on a given day, checking date overrides first."""
+    def get_hours(self, day: DayOfWeek, date: Optional[datetime] = None) -> Optional[tuple]:
+        """Get hours for a specific day, checking date overrides first."""
         if date:
+            return self.get_hours_with_override(day, date)
+        return self.hours.get(day)
+    
+    def is_open_on_day(self, day: DayOfWeek) -> bool:
+        """Check if store is regularly open on a day of the week, ignoring date overrides."""
+        return day in self.hours
+    
+    def is_open_with_override(self, day: DayOfWeek, date: datetime) -> bool:
+        """Check if store is open on a specific date, falling back to the day of week."""
+        if self.date_overrides:
             date_only = self._normalize_date(date)
             if date_only in self.date_overrides:
                 return self.date_overrides[date_only] is not None
         return day in self.hours
     
+    def is_open(self, day: DayOfWeek, date: Optional[datetime] = None) -> bool:
+        """Check if store is open on a given day, checking date overrides first."""
+        if date:
+            return self.is_open_with_override(day, date)
+        return day in self.hours
+    
     def get_date_override(self, date: datetime):
         """Get hours override for a specific date."""
         date_only = self._normalize_date(date)
@@ -87,130 +230,175 @@ class StoreHours:
     
     def has_date_override(self, date: datetime) -> bool:
         """Check if there's an override (open or closed) for a specific date."""
+        if not self.date_overrides:
+            return False
         return self._normalize_date(date) in self.date_overrides
+    
+    def get_overrides_in_range(self, start_date: datetime, end_date: datetime) -> Dict[date, Optional[tuple]]:
+        """Get all date overrides between start_date and end_date (inclusive)."""
+        start_only = self._normalize_date(start_date)
+        end_only = self._normalize_date(end_date)
+        # Keys are plain dates from __post_init__ and the setters, but a datetime can still
+        # be stored through the dict directly, and it can't be compared with a date
+        in_range = {}
+        for override_date, override in self.date_overrides.items():
+            date_only = _to_date(override_date)
+            if start_only <= date_only <= end_only:
+                in_range[date_only] = override
+        return in_range
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Employee:
     """Employee information and preferences."""
     name: str
-    preferred_days: List[DayOfWeek] = field(default_factory=list)
+    preferred_days: Set[DayOfWeek] = field(default_factory=set)
     preferred_start_time: Optional[time] = None  # Legacy: general preferred start time
     preferred_end_time: Optional[time] = None  # Legacy: general preferred end time
     preferred_times_by_day: Dict[DayOfWeek, tuple] = field(default_factory=dict)  # Day-specific preferred times
     available_times_by_day: Dict[DayOfWeek, tuple] = field(default_factory=dict)  # Day-specific available times (when not preferred/unavailable)
-    unavailable_days: List[DayOfWeek] = field(default_factory=list)  # Days completely unavailable
+    unavailable_days: Set[DayOfWeek] = field(default_factory=set)  # Days completely unavailable
     unavailable_times_by_day: Dict[DayOfWeek, tuple] = field(default_factory=dict)  # Time ranges when unavailable on specific days
     # Date-specific preferences (overrides day-of-week preferences)
-    preferred_dates: List[datetime] = field(default_factory=list)  # Specific dates that are preferred
-    preferred_times_by_date: Dict[datetime, tuple] = field(default_factory=dict)  # Preferred times for specific dates
-    unavailable_dates: List[datetime] = field(default_factory=list)  # Specific dates that are completely unavailable
-    unavailable_times_by_date: Dict[datetime, tuple] = field(default_factory=dict)  # Unavailable time ranges for specific dates
-    available_times_by_date: Dict[datetime, tuple] = field(default_factory=dict)  # Available time ranges for specific dates
+    preferred_dates: Set[date] = field(default_factory=set)  # Specific dates that are preferred
+    preferred_times_by_date: Dict[date, tuple] = field(default_factory=dict)  # Preferred times for specific dates
+    unavailable_dates: Set[date] = field(default_factory=set)  # Specific dates that are completely unavailable
+    unavailable_times_by_date: Dict[date, tuple] = field(default_factory=dict)  # Unavailable time ranges for specific dates
+    available_times_by_date: Dict[date, tuple] = field(default_factory=dict)  # Available time ranges for specific dates
     max_hours_per_month: float = 160.0
     min_hours_per_shift: float = 4.0
     max_hours_per_shift: float = 8.0
+    # Lookups derived from the preference fields, rebuilt by invalidate_availability_cache
+    _unavail_mask: int = field(init=False, repr=False, compare=False)
+    _preferred_mask: int = field(init=False, repr=False, compare=False)
+    _preferred_times: tuple = field(init=False, repr=False, compare=False)
+    _day_rules: tuple = field(init=False, repr=False, compare=False)
+    _avail_cache: dict = field(init=False, repr=False, compare=False)
+    _has_date_prefs: bool = field(init=False, repr=False, compare=False)
+    _has_date_unavail: bool = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Accept any iterable (e.g. lists from older callers) for the membership fields
+        for attr in ('preferred_days', 'unavailable_days'):
+            value = getattr(self, attr)
+            if not isinstance(value, set):
+                setattr(self, attr, set(value))
+        # Date-keyed fields were already converted to plain dates by __setattr__ as
+        # __init__ assigned them
+        self.invalidate_availability_cache()
+    
+    def __setattr__(self, name, value):
+        # Date-keyed fields are keyed by plain dates; accept datetimes from older callers,
+        # both at construction and on later reassignment
+        if name in _DATE_SET_FIELDS:
+            value = {_to_date(d) for d in value}
+        elif name in _DATE_DICT_FIELDS:
+            value = {_to_date(d): times for d, times in value.items()}
+        # object.__setattr__ rather than super(): slots=True rebuilds the class, which
+        # leaves the zero-argument super() cell pointing at the original
+        object.__setattr__(self, name, value)
+        if name in _LOOKUP_FIELDS and hasattr(self, '_unavail_mask'):
+            self.invalidate_availability_cache()
+    
+    def invalidate_availability_cache(self):
+        """Rebuild cached lookups; call after mutating any preference field in place."""
+        self._build_day_lookups()
+        self._avail_cache = {}
+        self._has_date_prefs = bool(self.preferred_dates or self.preferred_times_by_date)
+        self._has_date_unavail = bool(
+            self.unavailable_dates or self.unavailable_times_by_date or self.available_times_by_date
+        )
+    
+    def _build_day_lookups(self):
+        """Pack day-of-week preferences into bitmasks and 7-entry tuples indexed by day."""
+        unavail_mask = 0
+        for day in self.unavailable_days:
+            unavail_mask |= 1 << day
+        preferred_mask = 0
+        for day in self.preferred_days:
+            preferred_mask |= 1 << day
+        self._unavail_mask = unavail_mask
+        self._preferred_mask = preferred_mask
+        # Day-specific preferred times, falling back to the legacy general preference
+        legacy_times = None
+        if self.preferred_start_time and self.preferred_end_time:
+            legacy_times = (self.preferred_start_time, self.preferred_end_time)
+        self._preferred_times = tuple(
+            self.preferred_times_by_day[day] if day in self.preferred_times_by_day else legacy_times
+            for day in DayOfWeek
+        )
+        # One packed (unavailable_all_day, unavail_ranges, avail_ranges) rule per day, with fused ranges
+        # in seconds since midnight so availability checks are pure int math
+        self._day_rules = tuple(
+            (
+                bool((unavail_mask >> day) & 1),
+                _ranges_to_seconds(self.unavailable_times_by_day.get(day)),
+                _ranges_to_seconds(self.available_times_by_day.get(day)),
+            )
+            for day in DayOfWeek
+        )
     
     def can_work(self, day: DayOfWeek) -> bool:
         """Check if employee can work on a given day (not completely unavailable)."""
-        return day not in self.unavailable_days
+        return not (self._unavail_mask >> day) & 1
     
-    def _normalize_date(self, date: datetime) -> datetime:
+    def _normalize_date(self, date: datetime) -> date:
         """Normalize date to date-only (no time component)."""
-        return datetime(date.year, date.month, date.day)
-    
-    def _time_to_datetime(self, date_or_today: datetime, time_obj: time) -> datetime:
-        """Convert time to datetime for comparison."""
-        dt = datetime.combine(date_or_today, time_obj)
-        return dt
-    
-    def _times_overlap(self, start1: datetime, end1: datetime, start2: datetime, end2: datetime) -> bool:
-        """Check if two time ranges overlap."""
-        if end1 < start1:
-            end1 += timedelta(days=1)
-        if end2 < start2:
-            end2 += timedelta(days=1)
-        return start1 < end2 and end1 > start2
-    
-    def _is_within_range(self, start: datetime, end: datetime, range_start: datetime, range_end: datetime) -> bool:
-        """Check if a time range is within another time range."""
-        if end < start:
-            end += timedelta(days=1)
-        if range_end < range_start:
-            range_end += timedelta(days=1)
-        return start >= range_start and end <= range_end
+        return _to_date(date)
     
-    def is_available_at_time(self, day: DayOfWeek, start_time: time, end_time: time, date: Optional[datetime] = None) -> bool:
-        """Check if employee is available during a specific time range on a given day."""
-        if date:
+    def availability_rule(self, day: DayOfWeek, date: Optional[datetime] = None) -> tuple:
+        """
+        Resolve the availability rule that applies on a given day/date.
+        
+        Returns an (unavailable_all_day, unavail_ranges, avail_ranges) tuple with fused ranges in
+        seconds since midnight, for use with check_availability. Resolving once per date
+        lets a caller test many candidate shifts without re-reading the preference fields.
+        """
+        if date and self._has_date_unavail:
             date_only = self._normalize_date(date)
-            base_date = date
             
             # Check date-specific unavailability
             if date_only in self.unavailable_dates:
                 if date_only in self.unavailable_times_by_date:
-                    unavail_start, unavail_end = self.unavailable_times_by_date[date_only]
-                    shift_start = self._time_to_datetime(base_date, start_time)
-                    shift_end = self._time_to_datetime(base_date, end_time)
-                    unavail_start_dt = self._time_to_datetime(base_date, unavail_start)
-                    unavail_end_dt = self._time_to_datetime(base_date, unavail_end)
-                    return not self._times_overlap(shift_start, shift_end, unavail_start_dt, unavail_end_dt)
-                return False
+                    return (False, _ranges_to_seconds(self.unavailable_times_by_date[date_only]), None)
+                return (True, None, None)
             
             # Check date-specific available times
             if date_only in self.available_times_by_date:
-                avail_start, avail_end = self.available_times_by_date[date_only]
-                shift_start = self._time_to_datetime(base_date, start_time)
-                shift_end = self._time_to_datetime(base_date, end_time)
-                avail_start_dt = self._time_to_datetime(base_date, avail_start)
-                avail_end_dt = self._time_to_datetime(base_date, avail_end)
-                return self._is_within_range(shift_start, shift_end, avail_start_dt, avail_end_dt)
+                return (False, None, _ranges_to_seconds(self.available_times_by_date[date_only]))
         
         # Day-of-week preferences
-        if day in self.unavailable_days and day not in self.unavailable_times_by_day:
-            return False
-        
-        base_date = datetime.today()
-        shift_start = self._time_to_datetime(base_date, start_time)
-        shift_end = self._time_to_datetime(base_date, end_time)
-        
-        # Check day-specific unavailable times
-        if day in self.unavailable_times_by_day:
-            unavail_start, unavail_end = self.unavailable_times_by_day[day]
-            unavail_start_dt = self._time_to_datetime(base_date, unavail_start)
-            unavail_end_dt = self._time_to_datetime(base_date, unavail_end)
-            if self._times_overlap(shift_start, shift_end, unavail_start_dt, unavail_end_dt):
-                return False
-        
-        # Check day-specific available times
-        if day in self.available_times_by_day:
-            avail_start, avail_end = self.available_times_by_day[day]
-            avail_start_dt = self._time_to_datetime(base_date, avail_start)
-            avail_end_dt = self._time_to_datetime(base_date, avail_end)
-            return self._is_within_range(shift_start, shift_end, avail_start_dt, avail_end_dt)
-        
-        return True
+        return self._day_rules[day]
+    
+    def is_available_at_time(self, day: DayOfWeek, start_time: time, end_time: time, date: Optional[datetime] = None) -> bool:
+        """Check if employee is available during a specific time range on a given day."""
+        start = _time_to_seconds(start_time)
+        end = _time_to_seconds(end_time)
+        # The date only matters when date-specific rules exist
+        date_key = _to_date(date).toordinal() if date and self._has_date_unavail else 0
+        key = (day, start, end, date_key)
+        result = self._avail_cache.get(key)
+        if result is None:
+            result = _check_available(start, end, *self.availability_rule(day, date))
+            self._avail_cache[key] = result
+        return result
     
     def prefers_day(self, day: DayOfWeek, date: Optional[datetime] = None) -> bool:
         """Check if employee prefers a given day (checks date-specific preferences first)."""
-        if date:
+        if date and self._has_date_prefs:
             date_only = self._normalize_date(date)
-            if date_only in getattr(self, 'preferred_dates', []):
+            if date_only in self.preferred_dates:
                 return True
-            if date_only in getattr(self, 'preferred_times_by_date', {}):
+            if date_only in self.preferred_times_by_date:
                 return True
-        return day in self.preferred_days
+        return bool((self._preferred_mask >> day) & 1)
     
     def get_preferred_times(self, day: DayOfWeek) -> Optional[tuple]:
         """Get preferred times for a specific day."""
-        if day in self.preferred_times_by_day:
-            return self.preferred_times_by_day[day]
-        if self.preferred_start_time and self.preferred_end_time:
-            return (self.preferred_start_time, self.preferred_end_time)
-        return None
+        return self._preferred_times[day]
 
 
-@dataclass
+@dataclass(frozen=True, eq=False, **_SLOTS)
 class Shift:
     """A scheduled shift for an employee."""
     employee_name: str
@@ -218,37 +406,93 @@ class Shift:
     start_time: time
     end_time: time
     date: Optional[datetime] = None
+    _duration: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Frozen dataclass: derived/normalized values are set via object.__setattr__
+        object.__setattr__(self, 'employee_name', sys.intern(self.employee_name))
+        delta = _time_to_seconds(self.end_time) - _time_to_seconds(self.start_time)
+        if delta < 0:
+            delta += SECONDS_PER_DAY
+        object.__setattr__(self, '_duration', delta / 3600.0)
+    
+    def __eq__(self, other):
+        # An employee can only start one shift at a given moment, so that identifies the shift
+        if not isinstance(other, Shift):
+            return NotImplemented
+        return (
+            self.employee_name == other.employee_name and
+            self.start_time == other.start_time and
+            self.date == other.date and
+            self.day == other.day
+        )
+    
+    def __hash__(self):
+        return hash((self.employee_name, self.day, self.start_time, self.date))
     
     def duration_hours(self) -> float:
         """Calculate shift duration in hours."""
-        start = datetime.combine(datetime.today(), self.start_time)
-        end = datetime.combine(datetime.today(), self.end_time)
-        if end < start:
-            end += timedelta(days=1)
-        return (end - start).total_seconds() / 3600.0
+        return self._duration
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Schedule:
     """A monthly schedule containing all shifts."""
     month: int
     year: int
     shifts: List[Shift] = field(default_factory=list)
+    _by_employee: Dict[str, List[Shift]] = field(
+        default_factory=lambda: defaultdict(list), init=False, repr=False, compare=False
+    )
+    _by_day: Dict[DayOfWeek, List[Shift]] = field(
+        default_factory=lambda: defaultdict(list), init=False, repr=False, compare=False
+    )
+    _by_date: Dict[datetime, List[Shift]] = field(
+        default_factory=lambda: defaultdict(list), init=False, repr=False, compare=False
+    )
+    _hours_by_employee: Dict[str, float] = field(
+        default_factory=lambda: defaultdict(float), init=False, repr=False, compare=False
+    )
+    
+    def __post_init__(self):
+        self._index_shifts(self.shifts)
+    
+    def _index_shifts(self, shifts: List[Shift]):
+        """Record shifts in the per-employee, per-day and per-date indexes and running totals."""
+        by_employee = self._by_employee
+        by_day = self._by_day
+        by_date = self._by_date
+        hours_by_employee = self._hours_by_employee
+        for shift in shifts:
+            by_employee[shift.employee_name].append(shift)
+            by_day[shift.day].append(shift)
+            by_date[shift.date].append(shift)
+            hours_by_employee[shift.employee_name] += shift._duration
     
     def add_shift(self, shift: Shift):
         """Add a shift to the schedule."""
-        self.shifts.append(shift)
+        self.extend_shifts((shift,))
+    
+    def extend_shifts(self, shifts: Iterable[Shift]):
+        """Add several shifts to the schedule at once."""
+        shifts = list(shifts)
+        self.shifts.extend(shifts)
+        self._index_shifts(shifts)
     
     def get_shifts_for_employee(self, employee_name: str) -> List[Shift]:
         """Get all shifts for a specific employee."""
-        return [s for s in self.shifts if s.employee_name == employee_name]
+        return list(self._by_employee.get(employee_name, ()))
     
     def get_total_hours_for_employee(self, employee_name: str) -> float:
         """Calculate total hours worked by an employee."""
-        return sum(s.duration_hours() for s in self.get_shifts_for_employee(employee_name))
+        return self._hours_by_employee.get(employee_name, 0.0)
     
     def get_shifts_for_day(self, day: DayOfWeek, date: Optional[datetime] = None) -> List[Shift]:
         """Get all shifts for a specific day."""
         if date:
-            return [s for s in self.shifts if s.day == day and s.date == date]
-        return [s for s in self.shifts if s.day == day]
+            return [s for s in self._by_date.get(date, ()) if s.day == day]
+        return list(self._by_day.get(day, ()))
+    
+    def get_shifts_for_date(self, date: datetime) -> List[Shift]:
+        """Get all shifts on a specific date."""
+        return list(self._by_date.get(date, ()))
@@ -3,16 +3,20 @@ Streamlit application for employee shift scheduling.
 """
 import streamlit as st
 import streamlit.components.v1 as components
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import Dict, Optional
+from functools import lru_cache
+from bisect import bisect_left, insort
+from itertools import groupby
+from operator import attrgetter, itemgetter
+import hashlib
 import json
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from io import BytesIO
+import pandas as pd  # installed with streamlit; backs the day editor table
+try:
+    import orjson  # optional, faster JSON encode/decode for export/import
+except ImportError:
+    orjson = None
+from io import BytesIO, StringIO
 
 from models import (
     Employee, StoreHours, DayOfWeek, Schedule
@@ -40,6 +44,109 @@ EMPLOYEE_COLOR_PALETTE = [
 ]
 
 
+# Display names indexed by DayOfWeek (or date.weekday()), and the reverse lookup
+_DAY_NAMES = tuple(d.name.capitalize() for d in DayOfWeek)
+_DAY_FROM_NAME = dict(zip(_DAY_NAMES, DayOfWeek))
+
+
+# Page-level CSS. Streamlit drops any element a rerun doesn't emit again, so these
+# are re-sent on every run; keeping them as constants avoids rebuilding the strings.
+_STORE_HOURS_CSS = """
+<style>
+iframe[title*="streamlit"] {
+    margin-bottom: -2rem !important;
+}
+.stTabs {
+    margin-top: -2rem !important;
+    padding-top: 0 !important;
+}
+div[data-testid="stTabs"] {
+    margin-top: -2rem !important;
+}
+</style>
+"""
+# Tighter spacing for the date preference sections, sent once per Employees page run
+_DATE_PREFS_CSS = """
+<style>
+div[data-testid="column"] {
+    padding-top: 0.5rem !important;
+    padding-bottom: 0.5rem !important;
+}
+.stSelectbox, .stDateInput, .stRadio {
+    margin-bottom: 0.5rem !important;
+}
+</style>
+"""
+
+
+# Which Employee field a weekday row of the Add Employee form feeds, keyed by
+# (has_times, is_unavailable, is_preferred). Unavailable wins over preferred, and a
+# row with neither box checked and no times leaves the day fully available.
+_DAY_ROW_FIELDS = {
+    (True, True, True): 'unavailable_times_by_day',
+    (True, True, False): 'unavailable_times_by_day',
+    (True, False, True): 'preferred_times_by_day',
+    (True, False, False): 'available_times_by_day',
+    (False, True, True): 'unavailable_days',
+    (False, True, False): 'unavailable_days',
+    (False, False, True): 'preferred_days',
+    (False, False, False): None,
+}
+
+
+# Employee date fields listed under Active Date-Specific Preferences, in display order
+_PREF_SPEC = (
+    ("preferred_dates", "Preferred", False),
+    ("preferred_times_by_date", "Preferred", True),
+    ("unavailable_dates", "Unavailable", False),
+    ("unavailable_times_by_date", "Unavailable", True),
+    ("available_times_by_date", "Available Only", True),
+)
+
+
+# Employee tabs rendered per page, and date preferences listed before "Show all"
+_EMPLOYEES_PER_PAGE = 10
+_PREF_LIST_CAP = 20
+
+
+# Selectbox options and labels shared by every hour and month picker
+_HOUR_OPTIONS = tuple(range(24))
+_HOUR_LABELS = tuple(f"{h:02d}:00" for h in _HOUR_OPTIONS)
+_HOUR_FMT = _HOUR_LABELS.__getitem__
+_MONTH_OPTIONS = tuple(range(1, 13))
+# Indexed by month number (1-12)
+_MONTH_NAMES = ("",) + tuple(datetime(2000, m, 1).strftime('%B') for m in range(1, 13))
+
+
+# st.fragment (Streamlit 1.37+) reruns only the decorated block when one of its widgets
+# changes; older versions just run the block inline with the rest of the page
+_fragment = getattr(st, "fragment", None) or (lambda func: func)
+
+
+# Calendar HTML fragments shared by every month view
+_CAL_DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_CAL_HEADER_ROW = '<tr>' + ''.join(f'<th class="calendar-header">{name}</th>' for name in _CAL_DAY_NAMES) + '</tr>'
+_CAL_STYLE_HEADER = '<style>.calendar-table { width: 100%; border-collapse: separate; border-spacing: 2px; } .calendar-cell { background-color: #f5f5f5; padding: 12px; border-radius: 5px; border: 1px solid #ddd; min-height: 110px; vertical-align: top; width: 14.28%; } .calendar-header { font-weight: bold; text-align: center; padding: 8px; background-color: #4472C4; color: #ffffff; }</style><table class="calendar-table">' + _CAL_HEADER_ROW
+_SCHEDULE_CAL_STYLE_HEADER = '<style>.calendar-table { width: 100%; border-collapse: separate; border-spacing: 2px; } .calendar-cell { background-color: #f5f5f5; padding: 12px; border-radius: 5px; border: 1px solid #ddd; min-height: 120px; vertical-align: top; width: 14.28%; } .calendar-header { font-weight: bold; text-align: center; padding: 8px; background-color: #4472C4; color: #ffffff; } .shift-entry { font-size: 11px; line-height: 1.3; margin-bottom: 4px; padding: 2px 4px; border-radius: 3px; }</style><table class="calendar-table">' + _CAL_HEADER_ROW
+_CAL_EMPTY_CELL = '<td class="calendar-cell"></td>'
+_WEEKDAY_TO_DAYOFWEEK = tuple(DayOfWeek(i) for i in range(7))
+_CELL_TEMPLATE = (
+    '<td class="calendar-cell" style="background-color: {bg};">'
+    '<div style="font-size: 18px; font-weight: bold; margin-bottom: 8px; color: #333333;">{day}</div>'
+    '<div style="font-size: 12px; line-height: 1.4; word-wrap: break-word; color: #333333;">{text}</div></td>'
+)
+# Schedule cells hold a variable number of shift entries, so the cell is opened and closed separately
+_SHIFT_CELL_OPEN_TEMPLATE = (
+    '<td class="calendar-cell" style="background-color: {bg};">'
+    '<div style="font-size: 18px; font-weight: bold; margin-bottom: 8px; color: #333333;">{day}</div>'
+)
+_SHIFT_ENTRY_TEMPLATE = (
+    '<div class="shift-entry" style="background-color: {bg};">'
+    '<strong style="color: {fg};">{name}</strong><br>'
+    '<span style="color: {fg};">{times}<br>({hours:.1f}h)</span></div>'
+)
+
+
 def get_employee_colors(employee_list):
     """Generate distinct colors for each employee."""
     color_map = {}
@@ -54,6 +161,7 @@ def hex_to_rgb(hex_color):
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 
+@lru_cache(maxsize=64)
 def is_dark_color(hex_color):
     """Check if a color is dark enough to need white text."""
     r, g, b = hex_to_rgb(hex_color)
@@ -61,6 +169,25 @@ def is_dark_color(hex_color):
     return luminance < 0.5
 
 
+# Text color to use on each palette color, scored once at import
+PALETTE_TEXT_COLORS = {
+    color: "#ffffff" if is_dark_color(color) else "#000000"
+    for color in EMPLOYEE_COLOR_PALETTE
+}
+# (background, text) color pairs in palette order
+_PALETTE_PAIRS = tuple((color, PALETTE_TEXT_COLORS[color]) for color in EMPLOYEE_COLOR_PALETTE)
+
+
+def _legend_swatch_styles(color_column):
+    """Styler callback painting each legend color cell in its own color, with readable text."""
+    return [f"background-color: {color}; color: {PALETTE_TEXT_COLORS[color]}" for color in color_column]
+
+
+def get_employee_color_pairs(employee_list):
+    """Assign each employee a (background, text) color pair, in the same order as get_employee_colors."""
+    return {emp: _PALETTE_PAIRS[i % len(_PALETTE_PAIRS)] for i, emp in enumerate(employee_list)}
+
+
 # Page configuration
 st.set_page_config(
     page_title="Employee Shift Scheduler",
@@ -69,6 +196,9 @@ st.set_page_config(
 )
 
 # Serialization functions for export/import
+_DAY_BY_NAME = {d.name: d for d in DayOfWeek}
+
+
 def serialize_store_hours(store_hours: StoreHours) -> Dict:
     """Serialize StoreHours to a dictionary."""
     # Use getattr for backward compatibility
@@ -78,22 +208,16 @@ def serialize_store_hours(store_hours: StoreHours) -> Dict:
     hours_dict = {}
     for day, times in hours.items():
         if times and len(times) == 2:
-            hours_dict[day.name] = {
-                "open": times[0].isoformat(),
-                "close": times[1].isoformat()
-            }
+            hours_dict[day.name] = {"open": times[0], "close": times[1]}
     
     date_overrides_dict = {}
     for date_obj, override in date_overrides.items():
-        date_key = date_obj.strftime("%Y-%m-%d")
+        date_key = normalize_date(date_obj).isoformat()
         if override is None:
             date_overrides_dict[date_key] = None
         else:
             if override and len(override) == 2:
-                date_overrides_dict[date_key] = {
-                    "open": override[0].isoformat(),
-                    "close": override[1].isoformat()
-                }
+                date_overrides_dict[date_key] = {"open": override[0], "close": override[1]}
     
     return {
         "hours": hours_dict,
@@ -107,20 +231,23 @@ def deserialize_store_hours(data: Dict) -> StoreHours:
     
     # Restore regular hours
     for day_name, times_dict in data.get("hours", {}).items():
+        day = _DAY_BY_NAME.get(day_name)
+        if day is None:
+            # Skip invalid day names
+            continue
         try:
-            day = DayOfWeek[day_name]
             if times_dict and "open" in times_dict and "close" in times_dict:
                 open_time = time.fromisoformat(times_dict["open"])
                 close_time = time.fromisoformat(times_dict["close"])
                 store_hours.set_hours(day, open_time, close_time)
         except (KeyError, ValueError) as e:
-            # Skip invalid day names or time formats
+            # Skip invalid time formats
             continue
     
     # Restore date overrides
     for date_key, override in data.get("date_overrides", {}).items():
         try:
-            date_obj = datetime.strptime(date_key, "%Y-%m-%d")
+            date_obj = date.fromisoformat(date_key)
             if override is None:
                 store_hours.set_closed_for_date(date_obj)
             elif isinstance(override, dict) and "open" in override and "close" in override:
@@ -135,59 +262,44 @@ def deserialize_store_hours(data: Dict) -> StoreHours:
 
 
 def serialize_employee(employee: Employee) -> Dict:
-    """Serialize Employee to a dictionary."""
-    def serialize_time(t: time) -> str:
-        return t.isoformat() if t else None
+    """
+    Serialize Employee to a dictionary.
     
-    def serialize_datetime(dt: datetime) -> str:
-        return dt.strftime("%Y-%m-%d") if dt else None
+    time and date values are left in place for encode_export_data to write as ISO
+    strings; only dict keys are converted here, since JSON keys must be strings.
+    """
+    def serialize_date(dt: date) -> str:
+        return normalize_date(dt).isoformat() if dt else None
     
     def serialize_times_dict(times_dict, key_func):
         """Serialize a times dictionary (by day or by date)."""
         return {
-            key_func(k): {
-                "start": serialize_time(times[0]),
-                "end": serialize_time(times[1])
-            }
+            key_func(k): {"start": times[0], "end": times[1]}
             for k, times in times_dict.items()
             if times and len(times) == 2
         }
     
+    def day_key(day: DayOfWeek) -> str:
+        return day.name
+    
+    # Every field is declared on the slotted Employee, so read them directly
     return {
         "name": employee.name,
-        "preferred_days": [day.name for day in getattr(employee, 'preferred_days', [])],
-        "preferred_start_time": serialize_time(getattr(employee, 'preferred_start_time', None)),
-        "preferred_end_time": serialize_time(getattr(employee, 'preferred_end_time', None)),
-        "preferred_times_by_day": serialize_times_dict(
-            getattr(employee, 'preferred_times_by_day', {}),
-            lambda day: day.name
-        ),
-        "available_times_by_day": serialize_times_dict(
-            getattr(employee, 'available_times_by_day', {}),
-            lambda day: day.name
-        ),
-        "unavailable_days": [day.name for day in getattr(employee, 'unavailable_days', []) if day],
-        "unavailable_times_by_day": serialize_times_dict(
-            getattr(employee, 'unavailable_times_by_day', {}),
-            lambda day: day.name
-        ),
-        "preferred_dates": [serialize_datetime(dt) for dt in getattr(employee, 'preferred_dates', []) if dt],
-        "preferred_times_by_date": serialize_times_dict(
-            getattr(employee, 'preferred_times_by_date', {}),
-            serialize_datetime
-        ),
-        "unavailable_dates": [serialize_datetime(dt) for dt in getattr(employee, 'unavailable_dates', []) if dt],
-        "unavailable_times_by_date": serialize_times_dict(
-            getattr(employee, 'unavailable_times_by_date', {}),
-            serialize_datetime
-        ),
-        "available_times_by_date": serialize_times_dict(
-            getattr(employee, 'available_times_by_date', {}),
-            serialize_datetime
-        ),
-        "max_hours_per_month": getattr(employee, 'max_hours_per_month', 160.0),
-        "min_hours_per_shift": getattr(employee, 'min_hours_per_shift', 4.0),
-        "max_hours_per_shift": getattr(employee, 'max_hours_per_shift', 8.0)
+        "preferred_days": [day.name for day in sorted(employee.preferred_days)],
+        "preferred_start_time": employee.preferred_start_time,
+        "preferred_end_time": employee.preferred_end_time,
+        "preferred_times_by_day": serialize_times_dict(employee.preferred_times_by_day, day_key),
+        "available_times_by_day": serialize_times_dict(employee.available_times_by_day, day_key),
+        "unavailable_days": [day.name for day in sorted(employee.unavailable_days) if day is not None],
+        "unavailable_times_by_day": serialize_times_dict(employee.unavailable_times_by_day, day_key),
+        "preferred_dates": sorted(employee.preferred_dates),
+        "preferred_times_by_date": serialize_times_dict(employee.preferred_times_by_date, serialize_date),
+        "unavailable_dates": sorted(employee.unavailable_dates),
+        "unavailable_times_by_date": serialize_times_dict(employee.unavailable_times_by_date, serialize_date),
+        "available_times_by_date": serialize_times_dict(employee.available_times_by_date, serialize_date),
+        "max_hours_per_month": employee.max_hours_per_month,
+        "min_hours_per_shift": employee.min_hours_per_shift,
+        "max_hours_per_shift": employee.max_hours_per_shift
     }
 
 
@@ -199,13 +311,13 @@ def deserialize_employee(data: Dict) -> Employee:
         except (ValueError, AttributeError):
             return None
     
-    def deserialize_datetime(dt_str: str) -> Optional[datetime]:
+    def deserialize_date(dt_str: str) -> Optional[date]:
         try:
-            return datetime.strptime(dt_str, "%Y-%m-%d") if dt_str else None
+            return date.fromisoformat(dt_str) if dt_str else None
         except (ValueError, AttributeError):
             return None
     
-    def deserialize_times_dict(times_dict, key_func):
+    def deserialize_times_dict(times_dict, key_func, _parse=time.fromisoformat):
         """Deserialize a times dictionary (by day or by date)."""
         result = {}
         if not isinstance(times_dict, dict):
@@ -214,10 +326,10 @@ def deserialize_employee(data: Dict) -> Employee:
             try:
                 if not isinstance(times_data, dict):
                     continue
-                start = deserialize_time(times_data.get("start"))
-                end = deserialize_time(times_data.get("end"))
+                start = times_data.get("start")
+                end = times_data.get("end")
                 if start and end:
-                    result[key_func(key)] = (start, end)
+                    result[key_func(key)] = (_parse(start), _parse(end))
             except (KeyError, ValueError, TypeError):
                 # Skip invalid entries
                 continue
@@ -232,12 +344,12 @@ def deserialize_employee(data: Dict) -> Employee:
     
     # Restore preferred days
     try:
-        employee.preferred_days = [
-            DayOfWeek[day_name] for day_name in data.get("preferred_days", [])
-            if isinstance(day_name, str) and day_name.upper() in [d.name for d in DayOfWeek]
-        ]
+        employee.preferred_days = {
+            day for day_name in data.get("preferred_days", [])
+            if isinstance(day_name, str) and (day := _DAY_BY_NAME.get(day_name.upper())) is not None
+        }
     except (KeyError, AttributeError):
-        employee.preferred_days = []
+        employee.preferred_days = set()
     
     # Restore legacy preferred times
     if data.get("preferred_start_time"):
@@ -248,53 +360,74 @@ def deserialize_employee(data: Dict) -> Employee:
     # Restore times by day
     employee.preferred_times_by_day = deserialize_times_dict(
         data.get("preferred_times_by_day", {}),
-        lambda name: DayOfWeek[name]
+        lambda name: _DAY_BY_NAME[name]
     )
     employee.available_times_by_day = deserialize_times_dict(
         data.get("available_times_by_day", {}),
-        lambda name: DayOfWeek[name]
+        lambda name: _DAY_BY_NAME[name]
     )
     employee.unavailable_times_by_day = deserialize_times_dict(
         data.get("unavailable_times_by_day", {}),
-        lambda name: DayOfWeek[name]
+        lambda name: _DAY_BY_NAME[name]
     )
     
     # Restore unavailable days
     try:
-        employee.unavailable_days = [
-            DayOfWeek[day_name] for day_name in data.get("unavailable_days", [])
-            if isinstance(day_name, str) and day_name.upper() in [d.name for d in DayOfWeek]
-        ]
+        employee.unavailable_days = {
+            day for day_name in data.get("unavailable_days", [])
+            if isinstance(day_name, str) and (day := _DAY_BY_NAME.get(day_name.upper())) is not None
+        }
     except (KeyError, AttributeError):
-        employee.unavailable_days = []
+        employee.unavailable_days = set()
     
     # Restore preferred dates
-    employee.preferred_dates = [
+    employee.preferred_dates = {
         dt for dt_str in data.get("preferred_dates", [])
-        if (dt := deserialize_datetime(dt_str))
-    ]
+        if (dt := deserialize_date(dt_str))
+    }
     
     # Restore times by date
     employee.preferred_times_by_date = deserialize_times_dict(
         data.get("preferred_times_by_date", {}),
-        deserialize_datetime
+        deserialize_date
     )
-    employee.unavailable_dates = [
+    employee.unavailable_dates = {
         dt for dt_str in data.get("unavailable_dates", [])
-        if (dt := deserialize_datetime(dt_str))
-    ]
+        if (dt := deserialize_date(dt_str))
+    }
     employee.unavailable_times_by_date = deserialize_times_dict(
         data.get("unavailable_times_by_date", {}),
-        deserialize_datetime
+        deserialize_date
     )
     employee.available_times_by_date = deserialize_times_dict(
         data.get("available_times_by_date", {}),
-        deserialize_datetime
+        deserialize_date
     )
     
     return employee
 
 
+def _json_default(obj):
+    """Encode the time and date values the serializers leave in place as ISO strings."""
+    if isinstance(obj, (time, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_export_data(data: Dict) -> bytes:
+    """Encode export data as indented JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, default=_json_default).encode('utf-8')
+
+
+def decode_export_data(content: bytes) -> Dict:
+    """Decode exported JSON bytes back into a dictionary."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content.decode('utf-8'))
+
+
 # Initialize session state
 def init_session_state():
     """Initialize all session state variables."""
@@ -302,12 +435,20 @@ def init_session_state():
         'employees': [],
         'store_hours': StoreHours(),
         'schedule': None,
-        'current_page': "Store Hours"
+        'current_page': "Store Hours",
+        'data_version': 0,
+        'export_cache': None,
+        '_emp_keys': {},
+        '_override_label_cache': {}
     }
     for key, default_value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = default_value
     
+    # Names of all employees, for O(1) duplicate checks when adding
+    if 'employee_names' not in st.session_state:
+        st.session_state.employee_names = {emp.name for emp in st.session_state.employees}
+    
     # Ensure date_overrides exists (for backward compatibility)
     if not hasattr(st.session_state.store_hours, 'date_overrides'):
         st.session_state.store_hours.date_overrides = {}
@@ -328,19 +469,69 @@ def init_session_state():
 init_session_state()
 
 
-def day_name(day: DayOfWeek) -> str:
-    """Get day name from enum."""
-    return day.name.capitalize()
+def mark_data_changed():
+    """Bump the data version so the cached export payload is rebuilt."""
+    st.session_state.data_version += 1
+
+
+def rerun_fragment():
+    """Rerun only the calling fragment where supported, otherwise the whole app."""
+    if hasattr(st, "fragment"):
+        st.rerun(scope="fragment")
+    else:
+        st.rerun()
+
+
+def get_sorted_override_dates():
+    """Return the store's override dates in order, re-sorting only when the cache is stale."""
+    date_overrides = st.session_state.store_hours.date_overrides
+    sorted_dates = st.session_state.get("_sorted_override_dates")
+    if sorted_dates is None or len(sorted_dates) != len(date_overrides):
+        sorted_dates = sorted(date_overrides)
+        st.session_state["_sorted_override_dates"] = sorted_dates
+    return sorted_dates
+
+
+def track_override_added(date_only: date):
+    """Insert a newly overridden date into the cached sorted list."""
+    sorted_dates = st.session_state.get("_sorted_override_dates")
+    if sorted_dates is None:
+        return
+    idx = bisect_left(sorted_dates, date_only)
+    if idx == len(sorted_dates) or sorted_dates[idx] != date_only:
+        insort(sorted_dates, date_only)
 
 
-def day_from_name(name: str) -> DayOfWeek:
-    """Get day enum from name."""
-    return DayOfWeek[name.upper()]
+def track_override_removed(date_only: date):
+    """Drop a removed override date from the cached sorted list."""
+    sorted_dates = st.session_state.get("_sorted_override_dates")
+    if sorted_dates is None:
+        return
+    idx = bisect_left(sorted_dates, date_only)
+    if idx < len(sorted_dates) and sorted_dates[idx] == date_only:
+        del sorted_dates[idx]
 
 
-def normalize_date(date_obj: datetime) -> datetime:
+def get_schedule_legend(schedule: Schedule):
+    """
+    Return the schedule's employees in name order with their colors and total hours.
+    
+    Built once per generated schedule and kept in session state; the cache holds the
+    schedule itself so a regenerated schedule is never mistaken for the old one.
+    """
+    cached = st.session_state.get("_schedule_legend")
+    if cached is None or cached[0] is not schedule:
+        unique_employees = sorted({s.employee_name for s in schedule.shifts})
+        employee_colors = get_employee_colors(unique_employees)
+        employee_hours = {emp: schedule.get_total_hours_for_employee(emp) for emp in unique_employees}
+        cached = (schedule, unique_employees, employee_colors, employee_hours)
+        st.session_state["_schedule_legend"] = cached
+    return cached[1:]
+
+
+def normalize_date(date_obj: datetime) -> date:
     """Normalize datetime to date-only (no time component)."""
-    return datetime(date_obj.year, date_obj.month, date_obj.day)
+    return date_obj.date() if isinstance(date_obj, datetime) else date_obj
 
 
 def get_month_info(year: int, month: int):
@@ -352,59 +543,157 @@ def get_month_info(year: int, month: int):
     return first_day, last_day, last_day.day, first_day.weekday()
 
 
+@lru_cache(maxsize=256)
+def _fmt_time(hour: int, minute: int) -> str:
+    """Format an hour and minute like strftime('%I:%M %p'), without the locale machinery."""
+    return f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+# Whole-hour labels indexed by hour; shift and preference times come from hour pickers
+_AMPM = tuple(_fmt_time(h, 0) for h in range(24))
+
+
+def format_time(t: time) -> str:
+    """Format a time like strftime('%I:%M %p'), by table lookup for whole hours."""
+    return _fmt_time(t.hour, t.minute) if t.minute else _AMPM[t.hour]
+
+
 def format_time_range(start: time, end: time) -> str:
     """Format time range as string."""
-    return f"{start.strftime('%I:%M %p')} - {end.strftime('%I:%M %p')}"
+    return f"{format_time(start)} - {format_time(end)}"
 
 
 def ensure_date_attributes(emp):
     """Ensure employee has all date-specific attributes initialized."""
-    list_attrs = ['preferred_dates', 'unavailable_dates']
+    set_attrs = ['preferred_dates', 'unavailable_dates']
     dict_attrs = ['preferred_times_by_date', 'unavailable_times_by_date', 'available_times_by_date']
-    for attr in list_attrs:
+    for attr in set_attrs:
         if not hasattr(emp, attr):
-            setattr(emp, attr, [])
+            setattr(emp, attr, set())
+        elif not isinstance(getattr(emp, attr), set):
+            setattr(emp, attr, set(getattr(emp, attr)))
     for attr in dict_attrs:
         if not hasattr(emp, attr):
             setattr(emp, attr, {})
 
 
-def remove_preference_from_all_lists(emp, date_only):
-    """Remove a date preference from all possible lists/dicts."""
-    list_attrs = ['preferred_dates', 'unavailable_dates']
+def remove_preference_from_all_lists(emp, *dates):
+    """Remove the preferences for one or more dates from all lists/dicts in a single sweep."""
+    set_attrs = ['preferred_dates', 'unavailable_dates']
     dict_attrs = ['preferred_times_by_date', 'unavailable_times_by_date', 'available_times_by_date']
     
-    for attr in list_attrs:
-        attr_list = getattr(emp, attr, [])
-        if date_only in attr_list:
-            attr_list.remove(date_only)
+    for attr in set_attrs:
+        getattr(emp, attr, set()).difference_update(dates)
     for attr in dict_attrs:
         attr_dict = getattr(emp, attr, {})
-        if date_only in attr_dict:
-            del attr_dict[date_only]
+        for date_only in dates:
+            attr_dict.pop(date_only, None)
+    emp.invalidate_availability_cache()
+
+
+def employee_key(i: int, name: str) -> str:
+    """Build the session key ``{name}_{i}`` and record it for cleanup when employee i is deleted."""
+    key = f"{name}_{i}"
+    st.session_state["_emp_keys"].setdefault(i, set()).add(key)
+    return key
+
+
+# Widget key prefixes of the date preference and store override forms while editing a date
+_PREF_EDITING_TAGS = ("pref_date_input", "pref_type_radio", "pref_date_start", "pref_date_end")
+_OVERRIDE_EDITING_TAGS = ("override_date", "close_override_date", "override_open_time", "override_close_time")
+
+
+def clear_pref_editing_keys(i, editing_ord):
+    """Drop employee i's date preference form widgets for the date being edited, forcing them to rebuild."""
+    for tag in _PREF_EDITING_TAGS:
+        st.session_state.pop(f"{tag}_{i}_editing_{editing_ord}", None)
+
+
+def clear_override_editing_keys(editing_ord):
+    """Drop the store override form widgets for the date being edited, forcing them to rebuild."""
+    for tag in _OVERRIDE_EDITING_TAGS:
+        st.session_state.pop(f"{tag}_editing_{editing_ord}", None)
 
 
 def clear_editing_state(i):
     """Clear all editing state variables for employee i."""
-    for key in ['editing_pref_date', 'editing_pref_type', 'editing_pref_start', 'editing_pref_end']:
-        if f"{key}_{i}" in st.session_state:
-            del st.session_state[f"{key}_{i}"]
+    st.session_state.pop(f"editing_pref_{i}", None)
 
 
 def has_date_preference(emp, date_only):
     """Check if employee has any preference for the given date."""
-    list_attrs = ['preferred_dates', 'unavailable_dates']
+    set_attrs = ['preferred_dates', 'unavailable_dates']
     dict_attrs = ['preferred_times_by_date', 'unavailable_times_by_date', 'available_times_by_date']
-    return (any(date_only in getattr(emp, attr, []) for attr in list_attrs) or 
+    return (any(date_only in getattr(emp, attr, ()) for attr in set_attrs) or 
             any(date_only in getattr(emp, attr, {}) for attr in dict_attrs))
 
 
+def collect_date_preferences(emp):
+    """
+    Collect an employee's date-specific preferences as display rows sorted by date.
+    
+    Returns the rows and a map from each row's "Preference" string to its
+    (date_obj, pref_type, times).
+    """
+    # Collect all date preferences with mapping to actual date objects
+    date_prefs = []
+    date_pref_map = {}  # Maps display string to (date_obj, pref_type, times)
+    
+    date_strs = {}  # each date is formatted once even if it has several preferences
+    
+    # Helper function to add preferences
+    def add_pref(date_obj, pref_type, times=None):
+        date_str = date_strs.get(date_obj)
+        if date_str is None:
+            date_str = date_strs[date_obj] = date_obj.strftime("%B %d, %Y")
+        if times:
+            times_str = format_time_range(times[0], times[1])
+            display_str = f"{date_str} - {pref_type} ({times_str})"
+            type_str = pref_type
+        else:
+            display_str = f"{date_str} - {pref_type} (all day)"
+            type_str = f"{pref_type} (all day)"
+            times_str = "All day"
+        date_prefs.append({
+            "Preference": display_str,
+            "Date": date_str,
+            "Type": type_str,
+            "Times": times_str,
+            "_sort_key": normalize_date(date_obj)
+        })
+        date_pref_map[display_str] = (date_obj, pref_type, times)
+    
+    # Collect all preferences in one pass over the date fields
+    for attr, pref_type, has_times in _PREF_SPEC:
+        if has_times:
+            for date_obj, times in getattr(emp, attr).items():
+                add_pref(date_obj, pref_type, times)
+        else:
+            for date_obj in getattr(emp, attr):
+                add_pref(date_obj, pref_type)
+    
+    # Sort by date
+    date_prefs.sort(key=itemgetter("_sort_key"))
+    return date_prefs, date_pref_map
+
+
+def get_date_preferences(emp, i):
+    """Return collect_date_preferences(emp), reusing the rows cached for employee i until the data changes."""
+    cache_key = employee_key(i, "date_prefs_cache")
+    data_version = st.session_state.data_version
+    cached = st.session_state.get(cache_key)
+    if cached is None or cached[0] is not emp or cached[1] != data_version:
+        cached = (emp, data_version, collect_date_preferences(emp))
+        st.session_state[cache_key] = cached
+    return cached[2]
+
+
 def show_times_by_day(times_dict, title, suffix=""):
     """Display times by day in a formatted way."""
     if times_dict:
         st.markdown(f"**{title}:**")
         for day, times in sorted(times_dict.items(), key=lambda x: x[0].value):
-            st.markdown(f"  {day_name(day)}: {format_time_range(times[0], times[1])}{suffix}")
+            st.markdown(f"  {_DAY_NAMES[day]}: {format_time_range(times[0], times[1])}{suffix}")
 
 
 def get_default_store_hours(day: DayOfWeek) -> tuple:
@@ -417,19 +706,44 @@ def get_default_store_hours(day: DayOfWeek) -> tuple:
         return (time(11, 0), time(20, 0))  # 11:00 AM - 8:00 PM
 
 
-def show_employee_calendar_view(employee, year: int, month: int):
-    """Display a calendar view showing employee date-specific preferences for each day of the month."""
+def _dates_in_month(dates, year: int, month: int) -> tuple:
+    """Get the dates that fall in a month, sorted, as a hashable tuple."""
+    return tuple(sorted(d for d in dates if d.year == year and d.month == month))
+
+
+def _date_items_in_month(times_by_date, year: int, month: int) -> tuple:
+    """Get the (date, value) entries that fall in a month, sorted by date, as a hashable tuple."""
+    return tuple(sorted(
+        ((d, value) for d, value in times_by_date.items() if d.year == year and d.month == month),
+        key=lambda item: item[0]
+    ))
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _build_employee_calendar_html(
+    year: int,
+    month: int,
+    preferred_days: tuple,
+    unavailable_days: tuple,
+    preferred_dates: tuple,
+    preferred_times_by_date: tuple,
+    unavailable_dates: tuple,
+    unavailable_times_by_date: tuple,
+    available_times_by_date: tuple
+):
+    """Build the employee preference calendar HTML and its height from snapshots of the month's preferences."""
     first_day, last_day, num_days, start_weekday = get_month_info(year, month)
     
-    # Get employee date preferences
-    preferred_dates = getattr(employee, 'preferred_dates', [])
-    preferred_times_by_date = getattr(employee, 'preferred_times_by_date', {})
-    unavailable_dates = getattr(employee, 'unavailable_dates', [])
-    unavailable_times_by_date = getattr(employee, 'unavailable_times_by_date', {})
-    available_times_by_date = getattr(employee, 'available_times_by_date', {})
+    # Snapshots arrive as tuples for hashing; turn them back into sets/dicts for O(1) lookups per cell
+    preferred_days = frozenset(preferred_days)
+    unavailable_days = frozenset(unavailable_days)
+    preferred_dates = frozenset(preferred_dates)
+    unavailable_dates = frozenset(unavailable_dates)
+    preferred_times_by_date = dict(preferred_times_by_date)
+    unavailable_times_by_date = dict(unavailable_times_by_date)
+    available_times_by_date = dict(available_times_by_date)
     
     # Build calendar HTML table with controlled spacing
-    day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     
     # Calculate number of weeks needed
     total_cells = start_weekday + num_days
@@ -438,26 +752,22 @@ def show_employee_calendar_view(employee, year: int, month: int):
     # Calculate dynamic height: header (~40px) + (num_weeks * ~112px per week with spacing)
     calendar_height = 40 + (num_weeks * 112) + 20  # Extra padding at bottom
     
-    # Start building HTML
-    html = '<style>.calendar-table { width: 100%; border-collapse: separate; border-spacing: 2px; } .calendar-cell { background-color: #f5f5f5; padding: 12px; border-radius: 5px; border: 1px solid #ddd; min-height: 110px; vertical-align: top; width: 14.28%; } .calendar-header { font-weight: bold; text-align: center; padding: 8px; background-color: #4472C4; color: #ffffff; }</style><table class="calendar-table"><tr>'
-    
-    # Header row
-    for day_name_short in day_names:
-        html += f'<th class="calendar-header">{day_name_short}</th>'
-    html += '</tr>'
+    # Stream HTML into a buffer (style block and header row are shared constants)
+    buf = StringIO()
+    write = buf.write
+    write(_CAL_STYLE_HEADER)
     
     # Calendar rows
     current_date = 1
     for week in range(num_weeks):
-        html += '<tr>'
+        write('<tr>')
         for day_idx in range(7):
             if week == 0 and day_idx < start_weekday:
                 # Empty cell before month starts
-                html += '<td class="calendar-cell"></td>'
+                write(_CAL_EMPTY_CELL)
             elif current_date <= num_days:
                 # Day cell
-                date_obj = datetime(year, month, current_date)
-                date_only = normalize_date(date_obj)
+                date_only = date(year, month, current_date)
                 
                 # Check for date-specific preferences
                 pref_text = ""
@@ -488,35 +798,58 @@ def show_employee_calendar_view(employee, year: int, month: int):
                     bg_color = "#f1f8e9"  # Light green
                 else:
                     # No date-specific preference, show day of week info
-                    day_of_week = DayOfWeek(date_obj.weekday())
-                    if day_of_week in getattr(employee, 'preferred_days', []):
+                    day_of_week = _WEEKDAY_TO_DAYOFWEEK[day_idx]  # columns run Monday..Sunday
+                    if day_of_week in preferred_days:
                         pref_text = "Preferred (weekly)"
                         bg_color = "#e8eaf6"  # Very light purple
-                    elif day_of_week in getattr(employee, 'unavailable_days', []):
+                    elif day_of_week in unavailable_days:
                         pref_text = "Unavailable (weekly)"
                         bg_color = "#fce4ec"  # Very light pink
                     else:
                         pref_text = "Regular"
                         bg_color = "#f5f5f5"  # Light gray
                 
-                html += f'<td class="calendar-cell" style="background-color: {bg_color};"><div style="font-size: 18px; font-weight: bold; margin-bottom: 8px; color: #333333;">{current_date}</div><div style="font-size: 12px; line-height: 1.4; word-wrap: break-word; color: #333333;">{pref_text}</div></td>'
+                write(_CELL_TEMPLATE.format(bg=bg_color, day=current_date, text=pref_text))
                 current_date += 1
             else:
                 # Empty cell after month ends
-                html += '<td class="calendar-cell"></td>'
-        html += '</tr>'
+                write(_CAL_EMPTY_CELL)
+        write('</tr>')
     
-    html += '</table>'
+    write('</table>')
+    return buf.getvalue(), calendar_height
+
+
+def show_employee_calendar_view(employee, year: int, month: int):
+    """Display a calendar view showing employee date-specific preferences for each day of the month."""
+    # Snapshot only this month's preferences so unrelated edits don't invalidate the cached HTML
+    html, calendar_height = _build_employee_calendar_html(
+        year,
+        month,
+        tuple(sorted(getattr(employee, 'preferred_days', ()))),
+        tuple(sorted(getattr(employee, 'unavailable_days', ()))),
+        _dates_in_month(getattr(employee, 'preferred_dates', ()), year, month),
+        _date_items_in_month(getattr(employee, 'preferred_times_by_date', {}), year, month),
+        _dates_in_month(getattr(employee, 'unavailable_dates', ()), year, month),
+        _date_items_in_month(getattr(employee, 'unavailable_times_by_date', {}), year, month),
+        _date_items_in_month(getattr(employee, 'available_times_by_date', {}), year, month)
+    )
     components.html(html, height=calendar_height)
 
 
-def show_calendar_view(year: int, month: int):
-    """Display a calendar view showing store hours for each day of the month."""
+@st.cache_data(show_spinner=False, max_entries=128)
+def _build_store_calendar_html(year: int, month: int, weekday_hours: tuple, date_overrides: tuple):
+    """Build the store hours calendar HTML and its height from snapshots of the weekly hours and the month's overrides."""
     first_day, last_day, num_days, start_weekday = get_month_info(year, month)
     
     # Build calendar HTML table with controlled spacing
-    day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    date_overrides = getattr(st.session_state.store_hours, 'date_overrides', {})
+    date_overrides = dict(date_overrides)
+    
+    # Regular hours only vary by weekday, so format them once
+    weekday_hours_text = tuple(
+        format_time_range(hours[0], hours[1]) if hours else None
+        for hours in weekday_hours
+    )
     
     # Calculate number of weeks needed
     total_cells = start_weekday + num_days
@@ -525,26 +858,22 @@ def show_calendar_view(year: int, month: int):
     # Calculate dynamic height: header (~40px) + (num_weeks * ~112px per week with spacing)
     calendar_height = 40 + (num_weeks * 112) + 20  # Extra padding at bottom
     
-    # Start building HTML
-    html = '<style>.calendar-table { width: 100%; border-collapse: separate; border-spacing: 2px; } .calendar-cell { background-color: #f5f5f5; padding: 12px; border-radius: 5px; border: 1px solid #ddd; min-height: 110px; vertical-align: top; width: 14.28%; } .calendar-header { font-weight: bold; text-align: center; padding: 8px; background-color: #4472C4; color: #ffffff; }</style><table class="calendar-table"><tr>'
-    
-    # Header row
-    for day_name_short in day_names:
-        html += f'<th class="calendar-header">{day_name_short}</th>'
-    html += '</tr>'
+    # Stream HTML into a buffer (style block and header row are shared constants)
+    buf = StringIO()
+    write = buf.write
+    write(_CAL_STYLE_HEADER)
     
     # Calendar rows
     current_date = 1
     for week in range(num_weeks):
-        html += '<tr>'
+        write('<tr>')
         for day_idx in range(7):
             if week == 0 and day_idx < start_weekday:
                 # Empty cell before month starts
-                html += '<td class="calendar-cell"></td>'
+                write(_CAL_EMPTY_CELL)
             elif current_date <= num_days:
                 # Day cell
-                date_obj = datetime(year, month, current_date)
-                date_only = normalize_date(date_obj)
+                date_only = date(year, month, current_date)
                 
                 # Check for date override first
                 has_override = date_only in date_overrides
@@ -560,47 +889,62 @@ def show_calendar_view(year: int, month: int):
                         bg_color = "#e8f5e9"  # Light green
                 else:
                     # Use day of week hours
-                    day_of_week = DayOfWeek(date_obj.weekday())
-                    day_hours = st.session_state.store_hours.get_hours(day_of_week)
-                    if day_hours:
-                        hours_text = format_time_range(day_hours[0], day_hours[1])
+                    day_hours_text = weekday_hours_text[day_idx]  # columns run Monday..Sunday
+                    if day_hours_text:
+                        hours_text = day_hours_text
                         bg_color = "#f5f5f5"  # Light gray
                     else:
                         hours_text = "<strong>CLOSED</strong>"
                         bg_color = "#ffebee"  # Light red
                 
-                html += f'<td class="calendar-cell" style="background-color: {bg_color};"><div style="font-size: 18px; font-weight: bold; margin-bottom: 8px; color: #333333;">{current_date}</div><div style="font-size: 12px; line-height: 1.4; word-wrap: break-word; color: #333333;">{hours_text}</div></td>'
+                write(_CELL_TEMPLATE.format(bg=bg_color, day=current_date, text=hours_text))
                 current_date += 1
             else:
                 # Empty cell after month ends
-                html += '<td class="calendar-cell"></td>'
-        html += '</tr>'
+                write(_CAL_EMPTY_CELL)
+        write('</tr>')
     
-    html += '</table>'
+    write('</table>')
+    return buf.getvalue(), calendar_height
+
+
+def show_calendar_view(year: int, month: int):
+    """Display a calendar view showing store hours for each day of the month."""
+    store_hours = st.session_state.store_hours
+    html, calendar_height = _build_store_calendar_html(
+        year,
+        month,
+        tuple(store_hours.get_hours(day) for day in DayOfWeek),
+        _date_items_in_month(getattr(store_hours, 'date_overrides', {}), year, month)
+    )
     components.html(html, height=calendar_height)
 
 
-def show_schedule_calendar_view(schedule: Schedule, year: int, month: int):
-    """Display a calendar view showing shifts for each day of the month."""
+@st.cache_data(show_spinner=False, max_entries=128)
+def _build_schedule_calendar_html(year: int, month: int, shifts: tuple):
+    """
+    Build the schedule calendar HTML and its height.
+    
+    shifts is a snapshot of (date, employee_name, start_time, end_time, duration_hours)
+    tuples ordered by start time, with dates already reduced to plain dates (or None).
+    """
     first_day, last_day, num_days, start_weekday = get_month_info(year, month)
     
     # Build calendar HTML table with controlled spacing
-    day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     
-    # Group shifts by date
+    # Group shifts by date and collect unique employees in a single pass
     shifts_by_date = {}
-    for shift in schedule.shifts:
-        if shift.date:
-            date_only = normalize_date(shift.date)
-            if date_only not in shifts_by_date:
-                shifts_by_date[date_only] = []
-            shifts_by_date[date_only].append(shift)
+    seen_employees = {}
+    for shift in shifts:
+        seen_employees[shift[1]] = None
+        if shift[0]:
+            shifts_by_date.setdefault(shift[0], []).append(shift)
     
-    # Get unique employees and assign colors
-    unique_employees = sorted(set(s.employee_name for s in schedule.shifts))
+    # Assign colors to unique employees
+    unique_employees = sorted(seen_employees)
     
     # Generate color mapping for employees
-    employee_colors = get_employee_colors(unique_employees)
+    employee_colors = get_employee_color_pairs(unique_employees)
     
     # Calculate number of weeks needed
     total_cells = start_weekday + num_days
@@ -610,55 +954,61 @@ def show_schedule_calendar_view(schedule: Schedule, year: int, month: int):
     # Increased height to account for cells with multiple shifts
     calendar_height = 40 + (num_weeks * 130) + 30  # Extra padding at bottom
     
-    # Start building HTML
-    html = '<style>.calendar-table { width: 100%; border-collapse: separate; border-spacing: 2px; } .calendar-cell { background-color: #f5f5f5; padding: 12px; border-radius: 5px; border: 1px solid #ddd; min-height: 120px; vertical-align: top; width: 14.28%; } .calendar-header { font-weight: bold; text-align: center; padding: 8px; background-color: #4472C4; color: #ffffff; } .shift-entry { font-size: 11px; line-height: 1.3; margin-bottom: 4px; padding: 2px 4px; border-radius: 3px; }</style><table class="calendar-table"><tr>'
-    
-    # Header row
-    for day_name_short in day_names:
-        html += f'<th class="calendar-header">{day_name_short}</th>'
-    html += '</tr>'
+    # Stream HTML into a buffer (style block and header row are shared constants)
+    buf = StringIO()
+    write = buf.write
+    write(_SCHEDULE_CAL_STYLE_HEADER)
     
     # Calendar rows
     current_date = 1
     for week in range(num_weeks):
-        html += '<tr>'
+        write('<tr>')
         for day_idx in range(7):
             if week == 0 and day_idx < start_weekday:
                 # Empty cell before month starts
-                html += '<td class="calendar-cell"></td>'
+                write(_CAL_EMPTY_CELL)
             elif current_date <= num_days:
                 # Day cell
-                date_obj = datetime(year, month, current_date)
-                date_only = normalize_date(date_obj)
+                date_only = date(year, month, current_date)
                 
                 # Get shifts for this date
-                day_shifts = shifts_by_date.get(date_only, [])
-                day_shifts.sort(key=lambda x: x.start_time)
+                day_shifts = shifts_by_date.get(date_only)  # already in start-time order
                 
                 # Build cell content
-                cell_content = f'<div style="font-size: 18px; font-weight: bold; margin-bottom: 8px; color: #333333;">{current_date}</div>'
+                bg_color = "#e8f5e9" if day_shifts else "#f5f5f5"  # Light green for cells with shifts, else light gray
+                write(_SHIFT_CELL_OPEN_TEMPLATE.format(bg=bg_color, day=current_date))
                 
                 if day_shifts:
-                    for shift in day_shifts:
-                        duration = shift.duration_hours()
-                        employee_color = employee_colors.get(shift.employee_name, "#2196F3")
-                        # Determine text color based on background brightness
-                        text_color = "#ffffff" if is_dark_color(employee_color) else "#000000"
-                        shift_text = f"<strong style=\"color: {text_color};\">{shift.employee_name}</strong><br><span style=\"color: {text_color};\">{shift.start_time.strftime('%I:%M %p')} - {shift.end_time.strftime('%I:%M %p')}<br>({duration:.1f}h)</span>"
-                        cell_content += f'<div class="shift-entry" style="background-color: {employee_color};">{shift_text}</div>'
-                    bg_color = "#e8f5e9"  # Light green background for cells with shifts
+                    for _, employee_name, start_time, end_time, duration in day_shifts:
+                        bg, fg = employee_colors[employee_name]
+                        write(_SHIFT_ENTRY_TEMPLATE.format(
+                            bg=bg, fg=fg, name=employee_name,
+                            times=format_time_range(start_time, end_time), hours=duration
+                        ))
                 else:
-                    cell_content += '<div style="font-size: 12px; color: #999;">No shifts</div>'
-                    bg_color = "#f5f5f5"  # Light gray
+                    write('<div style="font-size: 12px; color: #999;">No shifts</div>')
                 
-                html += f'<td class="calendar-cell" style="background-color: {bg_color};">{cell_content}</td>'
+                write('</td>')
                 current_date += 1
             else:
                 # Empty cell after month ends
-                html += '<td class="calendar-cell"></td>'
-        html += '</tr>'
+                write(_CAL_EMPTY_CELL)
+        write('</tr>')
     
-    html += '</table>'
+    write('</table>')
+    return buf.getvalue(), calendar_height
+
+
+def show_schedule_calendar_view(schedule: Schedule, year: int, month: int):
+    """Display a calendar view showing shifts for each day of the month."""
+    html, calendar_height = _build_schedule_calendar_html(
+        year,
+        month,
+        tuple(
+            (normalize_date(s.date) if s.date else None, s.employee_name, s.start_time, s.end_time, s.duration_hours())
+            for s in sorted(schedule.shifts, key=attrgetter('start_time'))
+        )
+    )
     components.html(html, height=calendar_height)
 
 
@@ -705,12 +1055,16 @@ def main():
     st.sidebar.divider()
     st.sidebar.header("💾 Data Management")
     
-    # Export data
-    export_data = {
-        "store_hours": serialize_store_hours(st.session_state.store_hours),
-        "employees": [serialize_employee(emp) for emp in st.session_state.employees]
-    }
-    json_data = json.dumps(export_data, indent=2)
+    # Export data (only re-serialized when store hours or employees changed)
+    export_cache = st.session_state.export_cache
+    if export_cache is None or export_cache[0] != st.session_state.data_version:
+        export_data = {
+            "store_hours": serialize_store_hours(st.session_state.store_hours),
+            "employees": [serialize_employee(emp) for emp in st.session_state.employees]
+        }
+        export_cache = (st.session_state.data_version, encode_export_data(export_data))
+        st.session_state.export_cache = export_cache
+    json_data = export_cache[1]
     st.sidebar.download_button(
         label="📤 Export Data",
         data=json_data,
@@ -728,54 +1082,64 @@ def main():
     )
     
     # Track last processed file to avoid reprocessing
-    if 'last_imported_file_name' not in st.session_state:
-        st.session_state.last_imported_file_name = None
+    if 'last_imported_file_id' not in st.session_state:
+        st.session_state.last_imported_file_id = None
     
     if uploaded_file is not None:
-        # Check if this is a new file (different from last processed)
-        current_file_name = uploaded_file.name if hasattr(uploaded_file, 'name') else str(uploaded_file)
+        # Check if this is a new upload (file_id is unique per upload, even for the same name)
+        current_file_id = getattr(uploaded_file, 'file_id', None) or uploaded_file.name
         
-        if current_file_name != st.session_state.last_imported_file_name:
-            try:
-                # Streamlit file uploader returns bytes, need to decode to string
-                file_content = uploaded_file.read().decode('utf-8')
-                data = json.loads(file_content)
-                
-                # Restore store hours
-                if "store_hours" in data:
-                    st.session_state.store_hours = deserialize_store_hours(data["store_hours"])
-                    # Ensure date_overrides attribute exists
-                    if not hasattr(st.session_state.store_hours, 'date_overrides'):
-                        st.session_state.store_hours.date_overrides = {}
-                
-                # Restore employees
-                if "employees" in data:
-                    employees_list = []
-                    for emp_data in data["employees"]:
-                        emp = deserialize_employee(emp_data)
-                        # Ensure all date-specific attributes are initialized
-                        ensure_date_attributes(emp)
-                        employees_list.append(emp)
-                    st.session_state.employees = employees_list
-                
-                # Mark this file as processed
-                st.session_state.last_imported_file_name = current_file_name
-                
-                # Show success messages and force UI refresh
-                if "store_hours" in data:
-                    st.sidebar.success("Store hours imported successfully!")
-                if "employees" in data:
-                    st.sidebar.success(f"{len(data['employees'])} employees imported successfully!")
-                
-                # Clear any existing schedule since data has changed
-                st.session_state.schedule = None
-                
-                # Force UI refresh
-                st.rerun()
-            except Exception as e:
-                st.sidebar.error(f"Error importing data: {str(e)}")
-                import traceback
-                st.sidebar.exception(e)
+        if current_file_id != st.session_state.last_imported_file_id:
+            # Streamlit file uploader returns bytes
+            content = uploaded_file.getvalue()
+            content_sig = hashlib.blake2b(content, digest_size=8).digest()
+            if st.session_state.get("_last_import_sig") == (content_sig, st.session_state.data_version):
+                # Same bytes as the last import and nothing edited since, so there is nothing to restore
+                st.session_state.last_imported_file_id = current_file_id
+            else:
+                try:
+                    data = decode_export_data(content)
+                    
+                    # Restore store hours
+                    if "store_hours" in data:
+                        st.session_state.store_hours = deserialize_store_hours(data["store_hours"])
+                        st.session_state["_sorted_override_dates"] = None
+                        st.session_state["_override_label_cache"] = {}
+                        # Ensure date_overrides attribute exists
+                        if not hasattr(st.session_state.store_hours, 'date_overrides'):
+                            st.session_state.store_hours.date_overrides = {}
+                    
+                    # Restore employees
+                    if "employees" in data:
+                        employees_list = []
+                        for emp_data in data["employees"]:
+                            emp = deserialize_employee(emp_data)
+                            # Ensure all date-specific attributes are initialized
+                            ensure_date_attributes(emp)
+                            employees_list.append(emp)
+                        st.session_state.employees = employees_list
+                        st.session_state.employee_names = {emp.name for emp in employees_list}
+                    
+                    # Mark this file as processed
+                    st.session_state.last_imported_file_id = current_file_id
+                    mark_data_changed()
+                    st.session_state["_last_import_sig"] = (content_sig, st.session_state.data_version)
+                    
+                    # Show success messages and force UI refresh
+                    if "store_hours" in data:
+                        st.sidebar.success("Store hours imported successfully!")
+                    if "employees" in data:
+                        st.sidebar.success(f"{len(data['employees'])} employees imported successfully!")
+                    
+                    # Clear any existing schedule since data has changed
+                    st.session_state.schedule = None
+                    
+                    # Force UI refresh
+                    st.rerun()
+                except Exception as e:
+                    st.sidebar.error(f"Error importing data: {str(e)}")
+                    import traceback
+                    st.sidebar.exception(e)
     
     # Display the current page
     page = st.session_state.current_page
@@ -794,6 +1158,10 @@ def show_store_hours_page():
     """Display page for setting store hours."""
     st.header("Store Hours of Operation")
     
+    store_hours = st.session_state.store_hours
+    # init_session_state and the importer both guarantee date_overrides exists
+    date_overrides = store_hours.date_overrides
+    
     # Monthly Calendar View at the top
     st.markdown("**📆 Monthly Calendar View**")
     st.caption("View store hours for an entire month in calendar format.")
@@ -803,8 +1171,8 @@ def show_store_hours_page():
     with col_cal1:
         calendar_month = st.selectbox(
             "Month",
-            options=list(range(1, 13)),
-            format_func=lambda x: datetime(2000, x, 1).strftime("%B"),
+            options=_MONTH_OPTIONS,
+            format_func=_MONTH_NAMES.__getitem__,
             index=datetime.now().month - 1,
             key="calendar_month"
         )
@@ -818,20 +1186,7 @@ def show_store_hours_page():
         )
     
     # Add CSS to reduce spacing between calendar and tabs
-    st.markdown("""
-    <style>
-    iframe[title*="streamlit"] {
-        margin-bottom: -2rem !important;
-    }
-    .stTabs {
-        margin-top: -2rem !important;
-        padding-top: 0 !important;
-    }
-    div[data-testid="stTabs"] {
-        margin-top: -2rem !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_STORE_HOURS_CSS, unsafe_allow_html=True)
     
     # Display calendar
     show_calendar_view(calendar_year, calendar_month)
@@ -849,10 +1204,10 @@ def show_store_hours_page():
     
     for i, day in enumerate(days):
         with cols[i]:
-            st.markdown(f"**{day_name(day)}**")
+            st.markdown(f"**{_DAY_NAMES[day]}**")
             
             # Get current hours if set, otherwise use defaults
-            current_hours = st.session_state.store_hours.get_hours(day)
+            current_hours = store_hours.get_hours(day)
             if current_hours:
                 default_open, default_close = current_hours
             else:
@@ -874,10 +1229,11 @@ def show_store_hours_page():
             weekly_hours_inputs[day] = (open_time, close_time)
             
             # Add a clear button to close the store on this day
-            if st.session_state.store_hours.is_open(day):
+            if store_hours.is_open(day):
                 if st.button("Clear", key=f"clear_{day.name}", use_container_width=True):
-                    if day in st.session_state.store_hours.hours:
-                        del st.session_state.store_hours.hours[day]
+                    if day in store_hours.hours:
+                        del store_hours.hours[day]
+                    mark_data_changed()
                     st.rerun()
             else:
                 st.caption("Closed")
@@ -886,9 +1242,10 @@ def show_store_hours_page():
     if st.button("💾 Save Weekly Hours", type="primary", use_container_width=True, key="save_weekly_hours"):
         for day, (open_time, close_time) in weekly_hours_inputs.items():
             if open_time and close_time:
-                st.session_state.store_hours.set_hours(day, open_time, close_time)
-            elif day in st.session_state.store_hours.hours:
-                del st.session_state.store_hours.hours[day]
+                store_hours.set_hours(day, open_time, close_time)
+            elif day in store_hours.hours:
+                del store_hours.hours[day]
+        mark_data_changed()
         st.success("Weekly hours saved!")
         st.rerun()
     
@@ -903,13 +1260,15 @@ def show_store_hours_page():
         
         # Check if we're editing a selected override
         editing_override_date = st.session_state.get("editing_override_date")
+        editing_date_only = normalize_date(editing_override_date) if editing_override_date else None
+        # Editing widget keys are suffixed with the date's ordinal
+        editing_ord = editing_date_only.toordinal() if editing_override_date else None
         
         # Use a dynamic key that changes when we start editing to force widget recreation
         if editing_override_date:
-            editing_date = editing_override_date.date() if hasattr(editing_override_date, 'date') else editing_override_date
             # Use a key that includes the editing date to force widget update
-            date_key = f"override_date_editing_{editing_date}"
-            date_value = editing_date
+            date_key = f"override_date_editing_{editing_ord}"
+            date_value = editing_date_only
             st.caption(f"✏️ Editing: {editing_override_date.strftime('%B %d, %Y')}")
         else:
             # Not editing - use standard key
@@ -925,19 +1284,16 @@ def show_store_hours_page():
         # Check if there's an existing override for this date
         date_dt = datetime.combine(selected_date, time.min)
         date_only = normalize_date(date_dt)
-        # Use hasattr check for backward compatibility
-        date_overrides = getattr(st.session_state.store_hours, 'date_overrides', {})
         has_override = date_only in date_overrides
         
         # If editing, use the editing date's override, otherwise check selected date
         if editing_override_date:
-            edit_date_only = normalize_date(editing_override_date)
-            if edit_date_only in date_overrides:
-                existing_override = date_overrides[edit_date_only]
+            if editing_date_only in date_overrides:
+                existing_override = date_overrides[editing_date_only]
                 if existing_override is None:
                     is_closed = True
                     day_of_week = DayOfWeek(editing_override_date.weekday())
-                    day_hours = st.session_state.store_hours.get_hours(day_of_week)
+                    day_hours = store_hours.get_hours(day_of_week)
                     if day_hours:
                         default_open, default_close = day_hours
                     else:
@@ -948,7 +1304,7 @@ def show_store_hours_page():
                     is_closed = False
             else:
                 day_of_week = DayOfWeek(editing_override_date.weekday())
-                day_hours = st.session_state.store_hours.get_hours(day_of_week)
+                day_hours = store_hours.get_hours(day_of_week)
                 if day_hours:
                     default_open, default_close = day_hours
                     is_closed = False
@@ -962,7 +1318,7 @@ def show_store_hours_page():
                 # Explicitly closed
                 is_closed = True
                 day_of_week = DayOfWeek(selected_date.weekday())
-                day_hours = st.session_state.store_hours.get_hours(day_of_week)
+                day_hours = store_hours.get_hours(day_of_week)
                 if day_hours:
                     default_open = day_hours[0]
                     default_close = day_hours[1]
@@ -977,7 +1333,7 @@ def show_store_hours_page():
         else:
             # Use the day of week hours as default
             day_of_week = DayOfWeek(selected_date.weekday())
-            day_hours = st.session_state.store_hours.get_hours(day_of_week)
+            day_hours = store_hours.get_hours(day_of_week)
             if day_hours:
                 default_open = day_hours[0]
                 default_close = day_hours[1]
@@ -989,9 +1345,9 @@ def show_store_hours_page():
         
         # Use dynamic keys for time inputs when editing to force update
         if editing_override_date:
-            open_time_key = f"override_open_time_editing_{editing_date}"
-            close_time_key = f"override_close_time_editing_{editing_date}"
-            checkbox_key = f"close_override_date_editing_{editing_date}"
+            open_time_key = f"override_open_time_editing_{editing_ord}"
+            close_time_key = f"override_close_time_editing_{editing_ord}"
+            checkbox_key = f"close_override_date_editing_{editing_ord}"
         else:
             open_time_key = "override_open_time"
             close_time_key = "override_close_time"
@@ -1022,67 +1378,57 @@ def show_store_hours_page():
         if st.button(button_text, type="primary", use_container_width=True):
             # If editing, remove old override first
             if editing_override_date:
-                old_date_only = normalize_date(editing_override_date)
-                if old_date_only in st.session_state.store_hours.date_overrides:
-                    del st.session_state.store_hours.date_overrides[old_date_only]
+                if editing_date_only in date_overrides:
+                    del date_overrides[editing_date_only]
+                    track_override_removed(editing_date_only)
                 # Clear editing state
                 if "editing_override_date" in st.session_state:
                     del st.session_state["editing_override_date"]
             
             if close_store:
                 # Mark date as explicitly closed
-                if hasattr(st.session_state.store_hours, 'set_closed_for_date'):
-                    st.session_state.store_hours.set_closed_for_date(date_dt)
+                if hasattr(store_hours, 'set_closed_for_date'):
+                    store_hours.set_closed_for_date(date_dt)
                 else:
                     # Fallback: store None in date_overrides
-                    date_only = normalize_date(date_dt)
-                    st.session_state.store_hours.date_overrides[date_only] = None
+                    date_overrides[date_only] = None
                 st.success(f"Store marked as closed on {selected_date.strftime('%B %d, %Y')}")
             else:
-                if hasattr(st.session_state.store_hours, 'set_hours_for_date'):
-                    st.session_state.store_hours.set_hours_for_date(
+                if hasattr(store_hours, 'set_hours_for_date'):
+                    store_hours.set_hours_for_date(
                         date_dt, override_open, override_close
                     )
                 else:
                     # Fallback: store directly in date_overrides
-                    date_only = normalize_date(date_dt)
-                    st.session_state.store_hours.date_overrides[date_only] = (override_open, override_close)
+                    date_overrides[date_only] = (override_open, override_close)
                 st.success(f"Hours set for {selected_date.strftime('%B %d, %Y')}")
+            track_override_added(date_only)
+            mark_data_changed()
             st.rerun()
         
         # Cancel editing button if in edit mode
         if editing_override_date:
             if st.button("Cancel Editing", use_container_width=True):
                 if "editing_override_date" in st.session_state:
-                    editing_date = st.session_state["editing_override_date"]
-                    editing_date_only = editing_date.date() if hasattr(editing_date, 'date') else editing_date
                     # Clear the editing-specific keys
-                    old_date_key = f"override_date_editing_{editing_date_only}"
-                    old_checkbox_key = f"close_override_date_editing_{editing_date_only}"
-                    old_open_key = f"override_open_time_editing_{editing_date_only}"
-                    old_close_key = f"override_close_time_editing_{editing_date_only}"
-                    for old_key in [old_date_key, old_checkbox_key, old_open_key, old_close_key]:
-                        if old_key in st.session_state:
-                            del st.session_state[old_key]
+                    clear_override_editing_keys(editing_ord)
                     del st.session_state["editing_override_date"]
                 st.rerun()
         
-        # Check if there's an existing override for the selected date
-        date_dt_check = datetime.combine(selected_date, time.min)
-        date_only_check = normalize_date(date_dt_check)
-        has_override_for_selected = date_only_check in date_overrides
-        
-        if has_override_for_selected and st.button("Remove Override", use_container_width=True):
-            if hasattr(st.session_state.store_hours, 'remove_date_override'):
-                st.session_state.store_hours.remove_date_override(date_dt_check)
+        # has_override still reflects the selected date: every mutation above reruns
+        if has_override and st.button("Remove Override", use_container_width=True):
+            if hasattr(store_hours, 'remove_date_override'):
+                store_hours.remove_date_override(date_dt)
             else:
                 # Fallback: remove directly from date_overrides
-                if date_only_check in st.session_state.store_hours.date_overrides:
-                    del st.session_state.store_hours.date_overrides[date_only_check]
+                if date_only in date_overrides:
+                    del date_overrides[date_only]
+            track_override_removed(date_only)
             # Clear editing state if this was the override being edited
-            if editing_override_date and date_only_check == normalize_date(editing_override_date):
+            if editing_override_date and date_only == editing_date_only:
                 if "editing_override_date" in st.session_state:
                     del st.session_state["editing_override_date"]
+            mark_data_changed()
             st.success(f"Override removed for {selected_date.strftime('%B %d, %Y')}")
             st.rerun()
     
@@ -1090,46 +1436,402 @@ def show_store_hours_page():
         st.markdown("**Active Date Overrides:**")
         st.caption("Click an override to edit it:")
         
-        date_overrides = getattr(st.session_state.store_hours, 'date_overrides', {})
         if date_overrides:
-            # Sort dates
-            sorted_dates = sorted(date_overrides.keys())
+            sorted_dates = get_sorted_override_dates()
+            # Labels are keyed by (date, hours), so an edited override never reuses a stale one
+            label_cache = st.session_state["_override_label_cache"]
             
             # Display clickable overrides
-            for date in sorted_dates:
-                hours = date_overrides[date]
-                if hours is None:
-                    hours_str = "CLOSED"
-                else:
-                    hours_str = f"{hours[0].strftime('%I:%M %p')} - {hours[1].strftime('%I:%M %p')}"
-                
-                override_text = f"{date.strftime('%B %d, %Y')} - {day_name(DayOfWeek(date.weekday()))} - {hours_str}"
+            for override_date in sorted_dates:
+                hours = date_overrides[override_date]
+                override_text = label_cache.get((override_date, hours))
+                if override_text is None:
+                    hours_str = "CLOSED" if hours is None else format_time_range(hours[0], hours[1])
+                    override_text = f"{override_date:%B %d, %Y} - {_DAY_NAMES[override_date.weekday()]} - {hours_str}"
+                    label_cache[(override_date, hours)] = override_text
                 
-                if st.button(override_text, key=f"click_override_{date}", use_container_width=True):
+                if st.button(override_text, key=f"click_override_{override_date}", use_container_width=True):
                     # Store selected override info in session state to populate form
-                    st.session_state["editing_override_date"] = date
+                    st.session_state["editing_override_date"] = override_date
                     # Clear any old editing date keys to force widget recreation
-                    editing_date = date.date() if hasattr(date, 'date') else date
-                    old_date_key = f"override_date_editing_{editing_date}"
-                    old_checkbox_key = f"close_override_date_editing_{editing_date}"
-                    old_open_key = f"override_open_time_editing_{editing_date}"
-                    old_close_key = f"override_close_time_editing_{editing_date}"
-                    for old_key in [old_date_key, old_checkbox_key, old_open_key, old_close_key]:
-                        if old_key in st.session_state:
-                            del st.session_state[old_key]
+                    editing_ord = normalize_date(override_date).toordinal()
+                    clear_override_editing_keys(editing_ord)
                     st.rerun()
         else:
             st.caption("No date-specific overrides set. Use the form to add overrides.")
 
 
+@_fragment
+def show_edit_employee_form(emp, i):
+    """
+    Display the day-of-week edit form for employee i while it is open.
+    
+    The widgets sit in an st.form, so edits stay in the browser until Save or Cancel.
+    Cancel reruns only this fragment; Save reruns the whole app to refresh the
+    summary above and the sidebar export.
+    """
+    if not st.session_state.get(f"editing_employee_{i}", False):
+        return
+    
+    st.markdown("---")
+    st.markdown("**✏️ Edit Preferred Work Days & Times**")
+    
+    # Widgets in a form only send their values on submit, so editing the table or the
+    # hours field doesn't rerun anything until Save or Cancel is pressed
+    with st.form(employee_key(i, "edit_form"), clear_on_submit=False):
+        # Max hours editor
+        new_max_hours = st.number_input(
+            "Maximum Hours per Month",
+            min_value=0.0,
+            max_value=300.0,
+            value=emp.max_hours_per_month,
+            step=1.0,
+            key=employee_key(i, "edit_max_hours")
+        )
+        
+        st.markdown("**Preferred Work Days & Times**")
+        st.info("💡 **Tip:** \n"
+                "- **Preferred + times**: Preferred work times for that day\n"
+                "- **Preferred (no times)**: Available all day, prefers this day\n"
+                "- **Unavailable + times**: Unavailable during those hours (available at other times)\n"
+                "- **Unavailable (no times)**: Entire day unavailable\n"
+                "- **Neither checked + times**: Available only during those hours\n"
+                "- **Neither checked (no times)**: Available all day (just not preferred)")
+        
+        edit_preferred_days = []
+        edit_preferred_times_by_day = {}
+        edit_available_times_by_day = {}
+        edit_unavailable_days = []
+        edit_unavailable_times_by_day = {}
+        
+        # Get current values; the day fields are sets and the times fields dicts, so every
+        # membership test in the loop below is a hash lookup
+        current_preferred_days = emp.preferred_days
+        current_preferred_times = emp.preferred_times_by_day
+        current_available_times = emp.available_times_by_day
+        current_unavailable_days = emp.unavailable_days
+        current_unavailable_times = emp.unavailable_times_by_day
+        
+        # One editable table row per day instead of a row of checkboxes and selectboxes
+        day_rows = []
+        for day in DayOfWeek:
+            # Get current times if they exist
+            day_times = (current_preferred_times.get(day)
+                         or current_available_times.get(day)
+                         or current_unavailable_times.get(day))
+            day_rows.append({
+                "Day": _DAY_NAMES[day],
+                # Preferred/unavailable: either in the days list OR has times of that kind
+                "Preferred": day in current_preferred_days or day in current_preferred_times,
+                "Unavailable": day in current_unavailable_days or day in current_unavailable_times,
+                "Start": _HOUR_LABELS[day_times[0].hour] if day_times else None,
+                "End": _HOUR_LABELS[day_times[1].hour] if day_times else None,
+            })
+        
+        edited_days = st.data_editor(
+            pd.DataFrame(day_rows),
+            column_config={
+                "Day": st.column_config.TextColumn(disabled=True),
+                "Preferred": st.column_config.CheckboxColumn(help="Mark this as a preferred work day"),
+                "Unavailable": st.column_config.CheckboxColumn(
+                    help="Mark this day as unavailable. If times are set, only those hours are unavailable."
+                ),
+                "Start": st.column_config.SelectboxColumn(options=_HOUR_LABELS),
+                "End": st.column_config.SelectboxColumn(options=_HOUR_LABELS),
+            },
+            hide_index=True,
+            num_rows="fixed",
+            use_container_width=True,
+            key=employee_key(i, "edit_grid")
+        )
+        
+        for day, row in zip(DayOfWeek, edited_days.itertuples(index=False)):
+            is_preferred = bool(row.Preferred)
+            is_unavailable = bool(row.Unavailable)
+            # Cleared cells come back as None or NaN; only real labels are strings
+            day_start = time.fromisoformat(row.Start) if isinstance(row.Start, str) else None
+            day_end = time.fromisoformat(row.End) if isinstance(row.End, str) else None
+            
+            # Handle day availability based on checkboxes and times
+            if day_start and day_end:
+                if is_unavailable:
+                    # Partial unavailability - store the unavailable time range
+                    edit_unavailable_times_by_day[day] = (day_start, day_end)
+                elif is_preferred:
+                    # Preferred day - times are preferred times
+                    edit_preferred_times_by_day[day] = (day_start, day_end)
+                else:
+                    # Neither preferred nor unavailable - times are available times
+                    edit_available_times_by_day[day] = (day_start, day_end)
+            elif is_unavailable and not day_start and not day_end:
+                # Complete unavailability - add to unavailable_days list
+                edit_unavailable_days.append(_DAY_NAMES[day])
+            elif is_preferred and not day_start and not day_end:
+                # Preferred all day
+                edit_preferred_days.append(_DAY_NAMES[day])
+        
+        col_save, col_cancel = st.columns(2)
+        with col_save:
+            if st.form_submit_button("Save Changes", type="primary", use_container_width=True):
+                # Update employee preferences
+                emp.max_hours_per_month = new_max_hours
+                emp.preferred_days = {_DAY_FROM_NAME[d] for d in edit_preferred_days}
+                emp.preferred_times_by_day = edit_preferred_times_by_day
+                emp.available_times_by_day = edit_available_times_by_day
+                emp.unavailable_days = {_DAY_FROM_NAME[d] for d in edit_unavailable_days}
+                emp.unavailable_times_by_day = edit_unavailable_times_by_day
+                mark_data_changed()
+                # Close edit form
+                st.session_state[employee_key(i, "editing_employee")] = False
+                st.success(f"Employee '{emp.name}' updated successfully!")
+                st.rerun()
+        with col_cancel:
+            if st.form_submit_button("Cancel", use_container_width=True):
+                # Close edit form
+                st.session_state[employee_key(i, "editing_employee")] = False
+                rerun_fragment()
+
+
+@_fragment
+def show_date_preferences_section(emp, i):
+    """
+    Display employee i's date-specific preference calendar, list and form.
+    
+    Runs as a fragment: picking or cancelling an edit reruns only this section, while
+    setting or removing a preference reruns the app so the sidebar export picks it up.
+    """
+    st.markdown("---")
+    st.markdown("**📅 Date-Specific Preferences**")
+    st.caption("Set preferences for specific dates in the month (overrides day-of-week preferences).")
+    # Month/year selector
+    col_cal1, col_cal2 = st.columns(2)
+    with col_cal1:
+        pref_month = st.selectbox(
+            "Month",
+            options=_MONTH_OPTIONS,
+            format_func=_MONTH_NAMES.__getitem__,
+            index=datetime.now().month - 1,
+            key=employee_key(i, "pref_calendar_month")
+        )
+    with col_cal2:
+        pref_year = st.number_input(
+            "Year",
+            min_value=2020,
+            max_value=2100,
+            value=datetime.now().year,
+            key=employee_key(i, "pref_calendar_year")
+        )
+    
+    # Display calendar, preferences table, and form side by side
+    col_cal, col_prefs, col_form = st.columns([3, 2, 2])
+    
+    with col_cal:
+        st.markdown("**📆 Monthly Calendar View**")
+        st.caption(f"View {emp.name}'s date-specific preferences for the selected month.")
+        show_employee_calendar_view(emp, pref_year, pref_month)
+    
+    with col_prefs:
+        st.markdown("**Active Date-Specific Preferences:**")
+        # The sorted list is rebuilt only after this employee's data changes
+        date_prefs, date_pref_map = get_date_preferences(emp, i)
+        
+        if date_prefs:
+            
+            # Long lists only show the entries nearest today unless asked for all of them
+            shown_prefs = date_prefs
+            if len(date_prefs) > _PREF_LIST_CAP and not st.checkbox(
+                f"Show all {len(date_prefs)} preferences", key=employee_key(i, "show_all_prefs")
+            ):
+                today = date.today()
+                nearest = sorted(
+                    date_prefs,
+                    key=lambda x: abs(x["_sort_key"].toordinal() - today.toordinal())
+                )[:_PREF_LIST_CAP]
+                nearest_displays = {pref["Preference"] for pref in nearest}
+                shown_prefs = [pref for pref in date_prefs if pref["Preference"] in nearest_displays]
+                st.caption(f"Showing the {_PREF_LIST_CAP} nearest today.")
+            
+            # One selector and one button instead of a button per preference
+            pref_labels = {
+                pref["Preference"]: f"{pref['Date']} - {pref['Type']} - {pref['Times']}"
+                for pref in shown_prefs
+            }
+            pref_display = st.radio(
+                "Select a preference to edit:",
+                options=list(pref_labels),
+                format_func=pref_labels.__getitem__,
+                key=employee_key(i, "pref_select")
+            )
+            if pref_display is not None and st.button("Edit Selected", key=employee_key(i, "edit_selected_pref"), use_container_width=True):
+                date_obj, pref_type, pref_times = date_pref_map[pref_display]
+                # Store selected preference info in session state to populate form,
+                # as one (date, type, start hour, end hour) entry per employee
+                st.session_state[employee_key(i, "editing_pref")] = (
+                    (date_obj, pref_type, pref_times[0].hour, pref_times[1].hour) if pref_times
+                    else (date_obj, pref_type, None, None)
+                )
+                # Clear any old editing date keys to force widget recreation
+                editing_ord = normalize_date(date_obj).toordinal()
+                clear_pref_editing_keys(i, editing_ord)
+                rerun_fragment()
+        else:
+            st.caption("No date-specific preferences set. Use the form to add preferences.")
+    
+    with col_form:
+        st.markdown("**Set Date-Specific Preference**")
+        # Check if we're editing a selected preference
+        editing_pref = st.session_state.get(f"editing_pref_{i}")
+        editing_pref_date = editing_pref[0] if editing_pref else None
+        
+        # Use a dynamic key that changes when we start editing to force widget recreation
+        if editing_pref_date:
+            editing_date = normalize_date(editing_pref_date)
+            editing_ord = editing_date.toordinal()
+            # Use a key that includes the editing date to force widget update
+            date_key = f"pref_date_input_{i}_editing_{editing_ord}"
+            date_value = editing_date
+            _, default_type, default_start, default_end = editing_pref
+            st.caption(f"✏️ Editing: {editing_pref_date.strftime('%B %d, %Y')}")
+        else:
+            # Not editing - use standard key
+            date_key = employee_key(i, "pref_date_input")
+            date_value = st.session_state.get(date_key, datetime.now().date())
+            default_type = "Preferred"
+            default_start = None
+            default_end = None
+        
+        selected_pref_date = st.date_input(
+            "Select Date",
+            value=date_value,
+            key=date_key
+        )
+        date_only = normalize_date(selected_pref_date)
+        
+        # Map default_type to radio index
+        type_options = ["Preferred", "Unavailable", "Available Only"]
+        default_type_idx = type_options.index(default_type) if default_type in type_options else 0
+        
+        # Use dynamic keys for widgets when editing to force update
+        if editing_pref_date:
+            radio_key = f"pref_type_radio_{i}_editing_{editing_ord}"
+            start_key = f"pref_date_start_{i}_editing_{editing_ord}"
+            end_key = f"pref_date_end_{i}_editing_{editing_ord}"
+        else:
+            radio_key = employee_key(i, "pref_type_radio")
+            start_key = employee_key(i, "pref_date_start")
+            end_key = employee_key(i, "pref_date_end")
+        
+        pref_type = st.radio(
+            "Preference Type",
+            options=type_options,
+            index=default_type_idx,
+            key=radio_key,
+            help="Preferred: prefers this day/time\nUnavailable: cannot work during these hours\nAvailable Only: can only work during these hours"
+        )
+        
+        start_hour_idx = st.selectbox(
+            "Start Hour",
+            options=_HOUR_OPTIONS,
+            format_func=_HOUR_FMT,
+            index=default_start if default_start is not None else None,
+            key=start_key
+        )
+        pref_start = time(start_hour_idx, 0) if start_hour_idx is not None else None
+        
+        end_hour_idx = st.selectbox(
+            "End Hour",
+            options=_HOUR_OPTIONS,
+            format_func=_HOUR_FMT,
+            index=default_end if default_end is not None else None,
+            key=end_key
+        )
+        pref_end = time(end_hour_idx, 0) if end_hour_idx is not None else None
+        
+        # Change button text based on whether we're editing
+        button_text = "Save" if editing_pref_date else "Set Preference"
+        if st.button(button_text, type="primary", use_container_width=True, key=employee_key(i, "set_pref")):
+            # Clear the new date from every list, plus the original date when editing
+            if editing_pref_date:
+                remove_preference_from_all_lists(emp, editing_date, date_only)
+                # Clear editing state
+                clear_editing_state(i)
+            else:
+                remove_preference_from_all_lists(emp, date_only)
+            
+            # Set based on preference type
+            pref_config = {
+                "Preferred": ("preferred_times_by_date", "preferred_dates", "Preference set"),
+                "Unavailable": ("unavailable_times_by_date", "unavailable_dates", "Unavailability set"),
+                "Available Only": ("available_times_by_date", None, "Available times set")
+            }
+            
+            times_attr, dates_attr, success_msg = pref_config[pref_type]
+            
+            if pref_start and pref_end:
+                getattr(emp, times_attr)[date_only] = (pref_start, pref_end)
+                st.success(f"{success_msg} for {selected_pref_date.strftime('%B %d, %Y')}")
+            elif dates_attr:
+                getattr(emp, dates_attr).add(date_only)
+                st.success(f"{success_msg} for {selected_pref_date.strftime('%B %d, %Y')}")
+            else:
+                st.warning("Please set start and end times for 'Available Only' preference.")
+            emp.invalidate_availability_cache()
+            mark_data_changed()
+            
+            st.rerun()
+        
+        # Cancel editing button if in edit mode
+        if editing_pref_date:
+            if st.button("Cancel Editing", key=employee_key(i, "cancel_editing_pref"), use_container_width=True):
+                # Clear the editing-specific keys before clearing state
+                clear_pref_editing_keys(i, editing_ord)
+                clear_editing_state(i)
+                rerun_fragment()
+        
+        # Check if there's an existing preference for this date
+        has_pref = has_date_preference(emp, date_only)
+        
+        if has_pref and st.button("Remove Preference", use_container_width=True, key=employee_key(i, "remove_pref")):
+            remove_preference_from_all_lists(emp, date_only)
+            mark_data_changed()
+            
+            # Clear editing state if this was the preference being edited
+            if editing_pref_date and date_only == editing_date:
+                # Clear the editing-specific keys before clearing state
+                clear_pref_editing_keys(i, editing_ord)
+                clear_editing_state(i)
+            
+            st.success(f"Preference removed for {selected_pref_date.strftime('%B %d, %Y')}")
+            st.rerun()
+
+
 def show_employees_page():
     """Display page for managing employees."""
     st.header("Employee Management")
     
+    # Only one page of employee tabs is rendered per run
+    employees = st.session_state.employees
+    page_start = 0
+    if len(employees) > _EMPLOYEES_PER_PAGE:
+        num_pages = -(-len(employees) // _EMPLOYEES_PER_PAGE)
+        # The keyed session value seeds the widget, so no value= is passed; keep it
+        # in range after deletes shrink the roster
+        st.session_state.setdefault("employee_page", 1)
+        if st.session_state.employee_page > num_pages:
+            st.session_state.employee_page = num_pages
+        page_number = st.number_input(
+            f"Employee page (of {num_pages})",
+            min_value=1,
+            max_value=num_pages,
+            step=1,
+            key="employee_page"
+        )
+        page_start = (int(page_number) - 1) * _EMPLOYEES_PER_PAGE
+    page_employees = employees[page_start:page_start + _EMPLOYEES_PER_PAGE]
+    
     # Create tabs: "Add New Employee" first, then employee tabs
     tab_labels = ["➕ Add New Employee"]
-    if st.session_state.employees:
-        tab_labels.extend([f"👤 {emp.name}" for emp in st.session_state.employees])
+    tab_labels.extend([f"👤 {emp.name}" for emp in page_employees])
     
     all_tabs = st.tabs(tab_labels)
     
@@ -1159,22 +1861,21 @@ def show_employees_page():
                 "- **Neither checked + times**: Available only during those hours\n"
                 "- **Neither checked (no times)**: Available all day (just not preferred)")
         
-        preferred_days = []
-        preferred_times_by_day = {}
-        available_times_by_day = {}
-        unavailable_days = []
-        unavailable_times_by_day = {}
-        
-        # Hour options (0-23)
-        hour_options = list(range(24))
-        hour_labels = [f"{h:02d}:00" for h in hour_options]
+        # Employee fields filled from the weekday rows, named as Employee's constructor expects
+        day_fields = {
+            'preferred_days': set(),
+            'preferred_times_by_day': {},
+            'available_times_by_day': {},
+            'unavailable_days': set(),
+            'unavailable_times_by_day': {},
+        }
         
         # Create a table-like layout with day name, preferred checkbox, unavailable checkbox, and times
         for day in DayOfWeek:
             day_cols = st.columns([1, 1, 1, 1.5, 1.5])
             
             with day_cols[0]:
-                st.markdown(f"**{day_name(day)}**")
+                st.markdown(f"**{_DAY_NAMES[day]}**")
             
             with day_cols[1]:
                 is_preferred = st.checkbox(
@@ -1193,8 +1894,8 @@ def show_employees_page():
             with day_cols[3]:
                 start_hour_idx = st.selectbox(
                     "Start",
-                    options=hour_options,
-                    format_func=lambda x: hour_labels[x],
+                    options=_HOUR_OPTIONS,
+                    format_func=_HOUR_FMT,
                     index=None,
                     key=f"pref_start_{day.name}",
                     label_visibility="visible"
@@ -1204,63 +1905,60 @@ def show_employees_page():
             with day_cols[4]:
                 end_hour_idx = st.selectbox(
                     "End",
-                    options=hour_options,
-                    format_func=lambda x: hour_labels[x],
+                    options=_HOUR_OPTIONS,
+                    format_func=_HOUR_FMT,
                     index=None,
                     key=f"pref_end_{day.name}",
                     label_visibility="visible"
                 )
                 day_end = time(end_hour_idx, 0) if end_hour_idx is not None else None
             
-            # Handle day availability based on checkboxes and times
-            if day_start and day_end:
-                times = (day_start, day_end)
-                if is_unavailable:
-                    unavailable_times_by_day[day] = times
-                elif is_preferred:
-                    preferred_times_by_day[day] = times
-                else:
-                    available_times_by_day[day] = times
-            elif is_unavailable:
-                unavailable_days.append(day_name(day))
-            elif is_preferred:
-                preferred_days.append(day_name(day))
+            # Route the day to its field based on checkboxes and times
+            has_times = bool(day_start and day_end)
+            field_name = _DAY_ROW_FIELDS[has_times, is_unavailable, is_preferred]
+            if field_name is None:
+                continue
+            if has_times:
+                day_fields[field_name][day] = (day_start, day_end)
+            else:
+                day_fields[field_name].add(day)
         
         if st.button("Add Employee", type="primary"):
             if emp_name:
                 # Check if employee already exists
-                if any(emp.name == emp_name for emp in st.session_state.employees):
+                if emp_name in st.session_state.employee_names:
                     st.error(f"Employee '{emp_name}' already exists!")
                 else:
                     employee = Employee(
                         name=emp_name,
-                        preferred_days=[day_from_name(d) for d in preferred_days if d],
-                        preferred_times_by_day=preferred_times_by_day,
-                        available_times_by_day=available_times_by_day,
-                        unavailable_days=[day_from_name(d) for d in unavailable_days if d],
-                        unavailable_times_by_day=unavailable_times_by_day,
-                        max_hours_per_month=max_hours
+                        max_hours_per_month=max_hours,
+                        **day_fields
                     )
                     st.session_state.employees.append(employee)
+                    st.session_state.employee_names.add(emp_name)
+                    mark_data_changed()
                     st.success(f"Employee '{emp_name}' added successfully!")
                     st.rerun()
             else:
                 st.error("Please enter an employee name.")
     
     # Employee tabs (if any employees exist)
-    if st.session_state.employees:
-        for i, (emp, emp_tab) in enumerate(zip(st.session_state.employees, all_tabs[1:])):
+    if page_employees:
+        # The CSS is global, so one copy covers every employee tab's date preferences
+        st.markdown(_DATE_PREFS_CSS, unsafe_allow_html=True)
+        # i stays the employee's index in the full roster, which all per-employee keys use
+        for i, (emp, emp_tab) in enumerate(zip(page_employees, all_tabs[1:]), start=page_start):
             with emp_tab:
                 # Employee info and actions at the top
                 col1, col2 = st.columns([3, 1])
                 with col1:
                     st.markdown(f"**Max Hours/Month:** {emp.max_hours_per_month}")
-                    st.markdown(f"**Preferred Days:** {', '.join([day_name(d) for d in emp.preferred_days]) if emp.preferred_days else 'None'}")
+                    st.markdown(f"**Preferred Days:** {', '.join([_DAY_NAMES[d] for d in sorted(emp.preferred_days, key=lambda d: d.value)]) if emp.preferred_days else 'None'}")
                     
                     # Show unavailable days (completely unavailable)
-                    unavailable_days_list = [d for d in emp.unavailable_days if d not in getattr(emp, 'unavailable_times_by_day', {})]
+                    unavailable_days_list = [d for d in sorted(emp.unavailable_days, key=lambda d: d.value) if d not in getattr(emp, 'unavailable_times_by_day', {})]
                     if unavailable_days_list:
-                        st.markdown(f"**Unavailable Days (all day):** {', '.join([day_name(d) for d in unavailable_days_list])}")
+                        st.markdown(f"**Unavailable Days (all day):** {', '.join([_DAY_NAMES[d] for d in unavailable_days_list])}")
                     
                     # Show unavailable times by day (partial unavailability)
                     show_times_by_day(getattr(emp, 'unavailable_times_by_day', {}), 
@@ -1282,439 +1980,25 @@ def show_employees_page():
                     col_edit, col_delete = st.columns(2)
                     with col_edit:
                         if st.button("Edit", key=f"edit_{i}", use_container_width=True):
-                            if f"editing_employee_{i}" not in st.session_state:
-                                st.session_state[f"editing_employee_{i}"] = True
-                            else:
-                                st.session_state[f"editing_employee_{i}"] = not st.session_state[f"editing_employee_{i}"]
+                            editing_key = employee_key(i, "editing_employee")
+                            st.session_state[editing_key] = not st.session_state.get(editing_key, False)
                             st.rerun()
                     with col_delete:
                         if st.button("Delete", key=f"delete_{i}", use_container_width=True):
-                            st.session_state.employees.pop(i)
-                            # Clean up edit state if it exists
-                            if f"editing_employee_{i}" in st.session_state:
-                                del st.session_state[f"editing_employee_{i}"]
-                            # Clean up all related session state for this employee
-                            for key in list(st.session_state.keys()):
-                                if key.endswith(f"_{i}") and ("editing" in key or "pref" in key):
-                                    del st.session_state[key]
+                            st.session_state.employee_names.discard(st.session_state.employees.pop(i).name)
+                            mark_data_changed()
+                            # Clean up the edit and preference state recorded for this employee
+                            for key in st.session_state["_emp_keys"].pop(i, ()):
+                                st.session_state.pop(key, None)
                             st.rerun()
                 
                 # Edit employee preferences (only show if edit button was pressed)
-                if st.session_state.get(f"editing_employee_{i}", False):
-                    st.markdown("---")
-                    st.markdown("**✏️ Edit Preferred Work Days & Times**")
-                    
-                    # Max hours editor
-                    new_max_hours = st.number_input(
-                        "Maximum Hours per Month",
-                        min_value=0.0,
-                        max_value=300.0,
-                        value=emp.max_hours_per_month,
-                        step=1.0,
-                        key=f"edit_max_hours_{i}"
-                    )
-                    
-                    st.markdown("**Preferred Work Days & Times**")
-                    st.info("💡 **Tip:** \n"
-                            "- **Preferred + times**: Preferred work times for that day\n"
-                            "- **Preferred (no times)**: Available all day, prefers this day\n"
-                            "- **Unavailable + times**: Unavailable during those hours (available at other times)\n"
-                            "- **Unavailable (no times)**: Entire day unavailable\n"
-                            "- **Neither checked + times**: Available only during those hours\n"
-                            "- **Neither checked (no times)**: Available all day (just not preferred)")
-                    
-                    edit_preferred_days = []
-                    edit_preferred_times_by_day = {}
-                    edit_available_times_by_day = {}
-                    edit_unavailable_days = []
-                    edit_unavailable_times_by_day = {}
-                    
-                    # Hour options (0-23)
-                    hour_options = list(range(24))
-                    hour_labels = [f"{h:02d}:00" for h in hour_options]
-                    
-                    # Get current values
-                    current_preferred_days = getattr(emp, 'preferred_days', [])
-                    current_preferred_times = getattr(emp, 'preferred_times_by_day', {})
-                    current_available_times = getattr(emp, 'available_times_by_day', {})
-                    current_unavailable_days = getattr(emp, 'unavailable_days', [])
-                    current_unavailable_times = getattr(emp, 'unavailable_times_by_day', {})
-                    
-                    # Create a table-like layout with day name, preferred checkbox, unavailable checkbox, and times
-                    for day in DayOfWeek:
-                        day_cols = st.columns([1, 1, 1, 1.5, 1.5])
-                        
-                        with day_cols[0]:
-                            st.markdown(f"**{day_name(day)}**")
-                        
-                        # Determine current state
-                        is_currently_preferred = day in current_preferred_days
-                        is_currently_unavailable = day in current_unavailable_days
-                        has_preferred_times = day in current_preferred_times
-                        has_available_times = day in current_available_times
-                        has_unavailable_times = day in current_unavailable_times
-                        
-                        # Get current times if they exist
-                        current_start_idx = None
-                        current_end_idx = None
-                        if has_preferred_times:
-                            start_time, end_time = current_preferred_times[day]
-                            current_start_idx = start_time.hour
-                            current_end_idx = end_time.hour
-                        elif has_available_times:
-                            start_time, end_time = current_available_times[day]
-                            current_start_idx = start_time.hour
-                            current_end_idx = end_time.hour
-                        elif has_unavailable_times:
-                            start_time, end_time = current_unavailable_times[day]
-                            current_start_idx = start_time.hour
-                            current_end_idx = end_time.hour
-                        
-                        with day_cols[1]:
-                            # Check if preferred: either in preferred_days list OR has preferred_times
-                            is_preferred = st.checkbox(
-                                "Preferred",
-                                value=is_currently_preferred or has_preferred_times,
-                                key=f"edit_pref_{day.name}_{i}",
-                                help="Mark this as a preferred work day"
-                            )
-                        
-                        with day_cols[2]:
-                            # Check if unavailable: either in unavailable_days list OR has unavailable_times
-                            is_unavailable = st.checkbox(
-                                "Unavailable",
-                                value=is_currently_unavailable or has_unavailable_times,
-                                key=f"edit_unavail_{day.name}_{i}",
-                                help="Mark this day as unavailable. If times are set, only those hours are unavailable."
-                            )
-                        
-                        with day_cols[3]:
-                            start_hour_idx = st.selectbox(
-                                "Start",
-                                options=hour_options,
-                                format_func=lambda x: hour_labels[x],
-                                index=current_start_idx if current_start_idx is not None else None,
-                                key=f"edit_pref_start_{day.name}_{i}",
-                                label_visibility="visible"
-                            )
-                            day_start = time(start_hour_idx, 0) if start_hour_idx is not None else None
-                        
-                        with day_cols[4]:
-                            end_hour_idx = st.selectbox(
-                                "End",
-                                options=hour_options,
-                                format_func=lambda x: hour_labels[x],
-                                index=current_end_idx if current_end_idx is not None else None,
-                                key=f"edit_pref_end_{day.name}_{i}",
-                                label_visibility="visible"
-                            )
-                            day_end = time(end_hour_idx, 0) if end_hour_idx is not None else None
-                        
-                        # Handle day availability based on checkboxes and times
-                        if day_start and day_end:
-                            if is_unavailable:
-                                # Partial unavailability - store the unavailable time range
-                                edit_unavailable_times_by_day[day] = (day_start, day_end)
-                            elif is_preferred:
-                                # Preferred day - times are preferred times
-                                edit_preferred_times_by_day[day] = (day_start, day_end)
-                            else:
-                                # Neither preferred nor unavailable - times are available times
-                                edit_available_times_by_day[day] = (day_start, day_end)
-                        elif is_unavailable and not day_start and not day_end:
-                            # Complete unavailability - add to unavailable_days list
-                            edit_unavailable_days.append(day_name(day))
-                        elif is_preferred and not day_start and not day_end:
-                            # Preferred all day
-                            edit_preferred_days.append(day_name(day))
-                    
-                    col_save, col_cancel = st.columns(2)
-                    with col_save:
-                        if st.button("Save Changes", type="primary", key=f"save_edit_{i}", use_container_width=True):
-                            # Update employee preferences
-                            emp.max_hours_per_month = new_max_hours
-                            emp.preferred_days = [day_from_name(d) for d in edit_preferred_days]
-                            emp.preferred_times_by_day = edit_preferred_times_by_day
-                            emp.available_times_by_day = edit_available_times_by_day
-                            emp.unavailable_days = [day_from_name(d) for d in edit_unavailable_days]
-                            emp.unavailable_times_by_day = edit_unavailable_times_by_day
-                            # Close edit form
-                            st.session_state[f"editing_employee_{i}"] = False
-                            st.success(f"Employee '{emp.name}' updated successfully!")
-                            st.rerun()
-                    with col_cancel:
-                        if st.button("Cancel", key=f"cancel_edit_{i}", use_container_width=True):
-                            # Close edit form
-                            st.session_state[f"editing_employee_{i}"] = False
-                            st.rerun()
-                
-                # Date-specific preferences section
-                st.markdown("---")
-                st.markdown("**📅 Date-Specific Preferences**")
-                st.caption("Set preferences for specific dates in the month (overrides day-of-week preferences).")
-                # Add CSS to reduce spacing in date preferences section
-                st.markdown("""
-                <style>
-                div[data-testid="column"] {
-                    padding-top: 0.5rem !important;
-                    padding-bottom: 0.5rem !important;
-                }
-                .stSelectbox, .stDateInput, .stRadio {
-                    margin-bottom: 0.5rem !important;
-                }
-                </style>
-                """, unsafe_allow_html=True)
-                
-                # Month/year selector
-                col_cal1, col_cal2 = st.columns(2)
-                with col_cal1:
-                    pref_month = st.selectbox(
-                        "Month",
-                        options=list(range(1, 13)),
-                        format_func=lambda x: datetime(2000, x, 1).strftime("%B"),
-                        index=datetime.now().month - 1,
-                        key=f"pref_calendar_month_{i}"
-                    )
-                with col_cal2:
-                    pref_year = st.number_input(
-                        "Year",
-                        min_value=2020,
-                        max_value=2100,
-                        value=datetime.now().year,
-                        key=f"pref_calendar_year_{i}"
-                    )
-                
-                # Display calendar, preferences table, and form side by side
-                col_cal, col_prefs, col_form = st.columns([3, 2, 2])
-                
-                with col_cal:
-                    st.markdown("**📆 Monthly Calendar View**")
-                    st.caption(f"View {emp.name}'s date-specific preferences for the selected month.")
-                    show_employee_calendar_view(emp, pref_year, pref_month)
-                
-                with col_prefs:
-                    st.markdown("**Active Date-Specific Preferences:**")
-                    # Collect all date preferences with mapping to actual date objects
-                    date_prefs = []
-                    date_pref_map = {}  # Maps display string to (date_obj, pref_type, times)
-                    
-                    # Helper function to add preferences
-                    def add_pref(date_obj, pref_type, times=None, is_all_day=False):
-                        date_str = date_obj.strftime("%B %d, %Y")
-                        if times:
-                            times_str = format_time_range(times[0], times[1])
-                            display_str = f"{date_str} - {pref_type} ({times_str})"
-                            type_str = pref_type
-                        else:
-                            display_str = f"{date_str} - {pref_type} (all day)"
-                            type_str = f"{pref_type} (all day)"
-                            times_str = "All day"
-                        date_prefs.append({
-                            "Preference": display_str,
-                            "Date": date_str,
-                            "Type": type_str,
-                            "Times": times_str
-                        })
-                        date_pref_map[display_str] = (date_obj, pref_type, times)
-                    
-                    # Collect all preferences
-                    for date_obj in getattr(emp, 'preferred_dates', []):
-                        add_pref(date_obj, "Preferred")
-                    for date_obj, times in getattr(emp, 'preferred_times_by_date', {}).items():
-                        add_pref(date_obj, "Preferred", times)
-                    for date_obj in getattr(emp, 'unavailable_dates', []):
-                        add_pref(date_obj, "Unavailable")
-                    for date_obj, times in getattr(emp, 'unavailable_times_by_date', {}).items():
-                        add_pref(date_obj, "Unavailable", times)
-                    for date_obj, times in getattr(emp, 'available_times_by_date', {}).items():
-                        add_pref(date_obj, "Available Only", times)
-                    
-                    if date_prefs:
-                        # Sort by date
-                        date_prefs.sort(key=lambda x: datetime.strptime(x["Date"], "%B %d, %Y"))
-                        
-                        st.caption("Click a preference to edit it:")
-                        # Display clickable preferences
-                        for pref in date_prefs:
-                            pref_display = pref["Preference"]
-                            date_obj, pref_type, pref_times = date_pref_map[pref_display]
-                            
-                            # Make the preference itself clickable
-                            pref_text = f"{pref['Date']} - {pref['Type']} - {pref['Times']}"
-                            if st.button(pref_text, key=f"click_pref_{pref_display}_{i}", use_container_width=True):
-                                # Store selected preference info in session state to populate form
-                                st.session_state[f"editing_pref_date_{i}"] = date_obj
-                                st.session_state[f"editing_pref_type_{i}"] = pref_type
-                                if pref_times:
-                                    st.session_state[f"editing_pref_start_{i}"] = pref_times[0].hour
-                                    st.session_state[f"editing_pref_end_{i}"] = pref_times[1].hour
-                                else:
-                                    st.session_state[f"editing_pref_start_{i}"] = None
-                                    st.session_state[f"editing_pref_end_{i}"] = None
-                                # Clear any old editing date keys to force widget recreation
-                                editing_date = date_obj.date() if hasattr(date_obj, 'date') else date_obj
-                                old_date_key = f"pref_date_input_{i}_editing_{editing_date}"
-                                old_radio_key = f"pref_type_radio_{i}_editing_{editing_date}"
-                                old_start_key = f"pref_date_start_{i}_editing_{editing_date}"
-                                old_end_key = f"pref_date_end_{i}_editing_{editing_date}"
-                                for old_key in [old_date_key, old_radio_key, old_start_key, old_end_key]:
-                                    if old_key in st.session_state:
-                                        del st.session_state[old_key]
-                                st.rerun()
-                    else:
-                        st.caption("No date-specific preferences set. Use the form to add preferences.")
+                show_edit_employee_form(emp, i)
                 
-                with col_form:
-                    st.markdown("**Set Date-Specific Preference**")
-                    # Check if we're editing a selected preference
-                    editing_pref_date = st.session_state.get(f"editing_pref_date_{i}")
-                    
-                    # Use a dynamic key that changes when we start editing to force widget recreation
-                    if editing_pref_date:
-                        editing_date = editing_pref_date.date() if hasattr(editing_pref_date, 'date') else editing_pref_date
-                        # Use a key that includes the editing date to force widget update
-                        date_key = f"pref_date_input_{i}_editing_{editing_date}"
-                        date_value = editing_date
-                        default_type = st.session_state.get(f"editing_pref_type_{i}", "Preferred")
-                        default_start = st.session_state.get(f"editing_pref_start_{i}")
-                        default_end = st.session_state.get(f"editing_pref_end_{i}")
-                        st.caption(f"✏️ Editing: {editing_pref_date.strftime('%B %d, %Y')}")
-                    else:
-                        # Not editing - use standard key
-                        date_key = f"pref_date_input_{i}"
-                        date_value = st.session_state.get(date_key, datetime.now().date())
-                        default_type = "Preferred"
-                        default_start = None
-                        default_end = None
-                    
-                    selected_pref_date = st.date_input(
-                        "Select Date",
-                        value=date_value,
-                        key=date_key
-                    )
-                    
-                    # Hour options (0-23)
-                    hour_options = list(range(24))
-                    hour_labels = [f"{h:02d}:00" for h in hour_options]
-                    
-                    # Map default_type to radio index
-                    type_options = ["Preferred", "Unavailable", "Available Only"]
-                    default_type_idx = type_options.index(default_type) if default_type in type_options else 0
-                    
-                    # Use dynamic keys for widgets when editing to force update
-                    if editing_pref_date:
-                        radio_key = f"pref_type_radio_{i}_editing_{editing_date}"
-                        start_key = f"pref_date_start_{i}_editing_{editing_date}"
-                        end_key = f"pref_date_end_{i}_editing_{editing_date}"
-                    else:
-                        radio_key = f"pref_type_radio_{i}"
-                        start_key = f"pref_date_start_{i}"
-                        end_key = f"pref_date_end_{i}"
-                    
-                    pref_type = st.radio(
-                        "Preference Type",
-                        options=type_options,
-                        index=default_type_idx,
-                        key=radio_key,
-                        help="Preferred: prefers this day/time\nUnavailable: cannot work during these hours\nAvailable Only: can only work during these hours"
-                    )
-                    
-                    start_hour_idx = st.selectbox(
-                        "Start Hour",
-                        options=hour_options,
-                        format_func=lambda x: hour_labels[x],
-                        index=default_start if default_start is not None else None,
-                        key=start_key
-                    )
-                    pref_start = time(start_hour_idx, 0) if start_hour_idx is not None else None
-                    
-                    end_hour_idx = st.selectbox(
-                        "End Hour",
-                        options=hour_options,
-                        format_func=lambda x: hour_labels[x],
-                        index=default_end if default_end is not None else None,
-                        key=end_key
-                    )
-                    pref_end = time(end_hour_idx, 0) if end_hour_idx is not None else None
-                    
-                    # Change button text based on whether we're editing
-                    button_text = "Save" if editing_pref_date else "Set Preference"
-                    if st.button(button_text, type="primary", use_container_width=True, key=f"set_pref_{i}"):
-                        date_dt = datetime.combine(selected_pref_date, time.min)
-                        date_only = normalize_date(date_dt)
-                        
-                        # Initialize date-specific attributes if they don't exist
-                        ensure_date_attributes(emp)
-                        
-                        # If editing, remove old preference first (from the original date if different)
-                        if editing_pref_date:
-                            old_date_only = datetime(editing_pref_date.year, editing_pref_date.month, editing_pref_date.day)
-                            remove_preference_from_all_lists(emp, old_date_only)
-                            # Clear editing state
-                            clear_editing_state(i)
-                        
-                        # Remove from other lists for the new date
-                        remove_preference_from_all_lists(emp, date_only)
-                        
-                        # Set based on preference type
-                        pref_config = {
-                            "Preferred": ("preferred_times_by_date", "preferred_dates", "Preference set"),
-                            "Unavailable": ("unavailable_times_by_date", "unavailable_dates", "Unavailability set"),
-                            "Available Only": ("available_times_by_date", None, "Available times set")
-                        }
-                        
-                        times_attr, dates_attr, success_msg = pref_config[pref_type]
-                        
-                        if pref_start and pref_end:
-                            getattr(emp, times_attr)[date_only] = (pref_start, pref_end)
-                            st.success(f"{success_msg} for {selected_pref_date.strftime('%B %d, %Y')}")
-                        elif dates_attr:
-                            getattr(emp, dates_attr).append(date_only)
-                            st.success(f"{success_msg} for {selected_pref_date.strftime('%B %d, %Y')}")
-                        else:
-                            st.warning("Please set start and end times for 'Available Only' preference.")
-                        
-                        st.rerun()
-                    
-                    # Cancel editing button if in edit mode
-                    if editing_pref_date:
-                        if st.button("Cancel Editing", key=f"cancel_editing_pref_{i}", use_container_width=True):
-                            # Clear the editing-specific keys before clearing state
-                            editing_date = editing_pref_date.date() if hasattr(editing_pref_date, 'date') else editing_pref_date
-                            old_date_key = f"pref_date_input_{i}_editing_{editing_date}"
-                            old_radio_key = f"pref_type_radio_{i}_editing_{editing_date}"
-                            old_start_key = f"pref_date_start_{i}_editing_{editing_date}"
-                            old_end_key = f"pref_date_end_{i}_editing_{editing_date}"
-                            for old_key in [old_date_key, old_radio_key, old_start_key, old_end_key]:
-                                if old_key in st.session_state:
-                                    del st.session_state[old_key]
-                            clear_editing_state(i)
-                            st.rerun()
-                    
-                    date_dt = datetime.combine(selected_pref_date, time.min)
-                    date_only = normalize_date(date_dt)
-                    
-                    # Check if there's an existing preference for this date
-                    has_pref = has_date_preference(emp, date_only)
-                    
-                    if has_pref and st.button("Remove Preference", use_container_width=True, key=f"remove_pref_{i}"):
-                        remove_preference_from_all_lists(emp, date_only)
-                        
-                        # Clear editing state if this was the preference being edited
-                        if editing_pref_date and date_only == normalize_date(editing_pref_date):
-                            # Clear the editing-specific keys before clearing state
-                            editing_date = editing_pref_date.date() if hasattr(editing_pref_date, 'date') else editing_pref_date
-                            old_date_key = f"pref_date_input_{i}_editing_{editing_date}"
-                            old_radio_key = f"pref_type_radio_{i}_editing_{editing_date}"
-                            old_start_key = f"pref_date_start_{i}_editing_{editing_date}"
-                            old_end_key = f"pref_date_end_{i}_editing_{editing_date}"
-                            for old_key in [old_date_key, old_radio_key, old_start_key, old_end_key]:
-                                if old_key in st.session_state:
-                                    del st.session_state[old_key]
-                            clear_editing_state(i)
-                        
-                        st.success(f"Preference removed for {selected_pref_date.strftime('%B %d, %Y')}")
-                        st.rerun()
+                # Date-specific preferences section; every tab's body runs each rerun, so
+                # its calendar and widgets are only built once the user asks for them
+                if st.checkbox("📅 Manage date-specific preferences", key=employee_key(i, "show_date_prefs")):
+                    show_date_preferences_section(emp, i)
 
 
 def show_generate_schedule_page():
@@ -1770,6 +2054,182 @@ def show_generate_schedule_page():
         st.info("No schedule generated yet. Use the form above to create one.")
 
 
+@lru_cache(maxsize=1)
+def _pdf_paragraph_styles():
+    """Build the PDF title and legend paragraph styles once per process."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
+    
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=colors.HexColor('#1f4e79'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    legend_style = ParagraphStyle(
+        'LegendStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#1f4e79'),
+        spaceAfter=10,
+        alignment=TA_LEFT
+    )
+    return title_style, legend_style
+
+
+def get_schedule_pdf(schedule: Schedule, employee_filter: Optional[str]) -> bytes:
+    """
+    Return build_schedule_pdf(schedule, employee_filter), building each filter's PDF once per schedule.
+    
+    The cache holds the schedule itself, so a regenerated schedule starts a fresh one.
+    """
+    cached = st.session_state.get("_schedule_pdfs")
+    if cached is None or cached[0] is not schedule:
+        cached = (schedule, {})
+        st.session_state["_schedule_pdfs"] = cached
+    pdfs = cached[1]
+    pdf_data = pdfs.get(employee_filter)
+    if pdf_data is None:
+        pdf_data = pdfs[employee_filter] = build_schedule_pdf(schedule, employee_filter)
+    return pdf_data
+
+
+def build_schedule_pdf(schedule: Schedule, employee_filter: Optional[str]) -> bytes:
+    """Build the color-coded schedule PDF, optionally limited to one employee."""
+    # reportlab is only needed here, so keep it out of the app's startup imports
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer
+    
+    # Prepare PDF data
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    
+    # Get styles
+    title_style, legend_style = _pdf_paragraph_styles()
+    
+    # Filter shifts by selected employee
+    shifts_to_export = schedule.shifts
+    if employee_filter and employee_filter != "All Employees":
+        shifts_to_export = [s for s in schedule.shifts if s.employee_name == employee_filter]
+    
+    # Title
+    month_name = datetime(schedule.year, schedule.month, 1).strftime("%B %Y")
+    if employee_filter and employee_filter != "All Employees":
+        title_text = f"Employee Schedule - {employee_filter} - {month_name}"
+    else:
+        title_text = f"Employee Schedule - {month_name}"
+    title = Paragraph(title_text, title_style)
+    elements.append(title)
+    elements.append(Spacer(1, 0.3*inch))
+    
+    # Get unique employees from shifts and assign colors
+    unique_employees = sorted(set(s.employee_name for s in shifts_to_export))
+    employee_colors = get_employee_colors(unique_employees)
+    # Parse each distinct color once, with the text color that reads on it
+    color_objs = {h: colors.HexColor(h) for h in set(employee_colors.values())}
+    text_color_objs = {h: colors.white if is_dark_color(h) else colors.black for h in color_objs}
+    
+    # Add legend at the top if showing all employees
+    if employee_filter == "All Employees" and unique_employees:
+        legend_title = Paragraph("<b>Employee Color Legend:</b>", legend_style)
+        elements.append(legend_title)
+        
+        # Create legend table
+        legend_data = [["Employee", "Color"]]
+        for emp in unique_employees:
+            legend_data.append([emp, ""])  # Color will be shown via background
+        
+        legend_table = Table(legend_data, colWidths=[2*inch, 0.5*inch])
+        legend_style_list = [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ]
+        
+        # Add background colors to legend rows
+        for i, emp in enumerate(unique_employees, start=1):
+            legend_style_list.append(('BACKGROUND', (1, i), (1, i), color_objs[employee_colors[emp]]))
+        
+        legend_table.setStyle(TableStyle(legend_style_list))
+        elements.append(legend_table)
+        elements.append(Spacer(1, 0.3*inch))
+    
+    # Sort dated shifts once; groupby then walks each date's run of shifts in order
+    dated_shifts = sorted(
+        (s for s in shifts_to_export if s.date),
+        key=lambda x: (x.date, x.start_time)
+    )
+    
+    # Create table data
+    table_data = [["Date", "Day", "Employee", "Start Time", "End Time", "Duration (hrs)"]]
+    row_colors = []  # Track which employee color to use for each row
+    
+    for date_obj, date_shifts in groupby(dated_shifts, key=lambda x: normalize_date(x.date)):
+        date_str = date_obj.strftime("%Y-%m-%d")
+        for shift in date_shifts:
+            table_data.append([
+                date_str,
+                shift.day.name if shift.day is not None else "",
+                shift.employee_name,
+                shift.start_time.strftime("%I:%M %p"),
+                shift.end_time.strftime("%I:%M %p"),
+                f"{shift.duration_hours():.2f}"
+            ])
+            row_colors.append(employee_colors[shift.employee_name])
+    
+    # Create table; LongTable lays out long row lists cheaply when splitting them across pages,
+    # and the header row repeats on each page
+    table = LongTable(
+        table_data,
+        colWidths=[1.2*inch, 0.8*inch, 1.5*inch, 1*inch, 1*inch, 1*inch],
+        repeatRows=1
+    )
+    
+    # Build table style with color coding
+    table_style = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ]
+    
+    # Add background colors and text colors based on employee, one command pair per
+    # run of consecutive rows sharing a color
+    first_row = 1
+    for row_color, run in groupby(row_colors):
+        last_row = first_row + sum(1 for _ in run) - 1
+        table_style.append(('BACKGROUND', (0, first_row), (-1, last_row), color_objs[row_color]))
+        # Use white text for dark backgrounds, black for light backgrounds
+        table_style.append(('TEXTCOLOR', (0, first_row), (-1, last_row), text_color_objs[row_color]))
+        first_row = last_row + 1
+    
+    table.setStyle(TableStyle(table_style))
+    
+    elements.append(table)
+    
+    # Build PDF
+    doc.build(elements)
+    pdf_data = buffer.getvalue()
+    buffer.close()
+    
+    return pdf_data
+
+
 def show_view_schedule_page():
     """Display page for viewing the generated schedule."""
     st.header("View Schedule")
@@ -1788,8 +2248,8 @@ def show_view_schedule_page():
         with col1:
             calendar_month = st.selectbox(
                 "Month",
-                options=list(range(1, 13)),
-                format_func=lambda x: datetime(2000, x, 1).strftime("%B"),
+                options=_MONTH_OPTIONS,
+                format_func=_MONTH_NAMES.__getitem__,
                 index=schedule.month - 1,
                 key="schedule_calendar_month"
             )
@@ -1805,53 +2265,46 @@ def show_view_schedule_page():
         # Display calendar
         show_schedule_calendar_view(schedule, calendar_year, calendar_month)
         
-        # Display color legend
-        unique_employees = sorted(set(s.employee_name for s in schedule.shifts))
+        # Display color legend; colors match the calendar view
+        unique_employees, employee_colors, employee_hours = get_schedule_legend(schedule)
         if unique_employees:
             st.markdown("**Employee Color Legend:**")
             
-            # Generate color mapping (same as in calendar view)
-            employee_colors = get_employee_colors(unique_employees)
-            
-            # Calculate total hours for each employee
-            employee_hours = {}
-            for emp in unique_employees:
-                employee_hours[emp] = schedule.get_total_hours_for_employee(emp)
-            
-            # Display legend in columns
-            num_cols = min(4, len(unique_employees))
-            cols = st.columns(num_cols)
-            for i, emp in enumerate(unique_employees):
-                with cols[i % num_cols]:
-                    color = employee_colors[emp]
-                    total_hours = employee_hours[emp]
-                    st.markdown(
-                        f'<div style="display: flex; align-items: center; margin-bottom: 8px;">'
-                        f'<div style="width: 20px; height: 20px; background-color: {color}; border-radius: 3px; margin-right: 8px; border: 1px solid #ddd;"></div>'
-                        f'<span><strong>{emp}</strong> - {total_hours:.1f} hrs</span>'
-                        f'</div>',
-                        unsafe_allow_html=True
-                    )
+            # Display legend as one table; the dataframe grid only draws the rows in view
+            legend_df = pd.DataFrame({
+                "Color": [employee_colors[emp] for emp in unique_employees],
+                "Employee": unique_employees,
+                "Hours": [employee_hours[emp] for emp in unique_employees],
+            })
+            st.dataframe(
+                # A Styler's own display text wins over column_config, so hours are formatted here
+                legend_df.style.apply(_legend_swatch_styles, subset=["Color"]).format({"Hours": "{:.1f} hrs"}),
+                hide_index=True,
+                use_container_width=True
+            )
     
     with tab2:
         # Display schedule by day
-        # Group shifts by date
-        dates = sorted(set(s.date for s in schedule.shifts if s.date))
+        # Group shifts by date in one pass
+        shifts_by_date = {}
+        for s in schedule.shifts:
+            if s.date:
+                shifts_by_date.setdefault(s.date, []).append(s)
         
-        for date in dates:
-            st.subheader(date.strftime("%A, %B %d, %Y"))
+        for shift_date in sorted(shifts_by_date):
+            st.subheader(shift_date.strftime("%A, %B %d, %Y"))
             
             # Get shifts for this date
-            day_shifts = [s for s in schedule.shifts if s.date == date]
-            day_shifts.sort(key=lambda x: x.start_time)
+            day_shifts = shifts_by_date[shift_date]
+            day_shifts.sort(key=attrgetter("start_time"))
             
             if day_shifts:
                 for shift in day_shifts:
                     duration = shift.duration_hours()
                     st.write(
                         f"**{shift.employee_name}** - "
-                        f"{shift.start_time.strftime('%I:%M %p')} to "
-                        f"{shift.end_time.strftime('%I:%M %p')} "
+                        f"{format_time(shift.start_time)} to "
+                        f"{format_time(shift.end_time)} "
                         f"({duration:.1f} hours)"
                     )
             else:
@@ -1876,24 +2329,20 @@ def show_view_schedule_page():
             st.metric("Total Hours", f"{total_hours:.1f}")
             
             if employee_shifts:
-                # Group by date
+                # Group by calendar date; shifts are already sorted, so groups come out in date order
                 shifts_by_date = {}
                 for shift in employee_shifts:
                     if shift.date:
-                        date_key = shift.date.strftime("%Y-%m-%d")
-                        if date_key not in shifts_by_date:
-                            shifts_by_date[date_key] = []
-                        shifts_by_date[date_key].append(shift)
+                        shifts_by_date.setdefault(normalize_date(shift.date), []).append(shift)
                 
-                for date_key in sorted(shifts_by_date.keys()):
-                    date = datetime.strptime(date_key, "%Y-%m-%d")
-                    st.subheader(date.strftime("%A, %B %d, %Y"))
+                for shift_date, date_shifts in shifts_by_date.items():
+                    st.subheader(shift_date.strftime("%A, %B %d, %Y"))
                     
-                    for shift in shifts_by_date[date_key]:
+                    for shift in date_shifts:
                         duration = shift.duration_hours()
                         st.write(
-                            f"{shift.start_time.strftime('%I:%M %p')} to "
-                            f"{shift.end_time.strftime('%I:%M %p')} "
+                            f"{format_time(shift.start_time)} to "
+                            f"{format_time(shift.end_time)} "
                             f"({duration:.1f} hours)"
                         )
                     st.divider()
@@ -1912,136 +2361,7 @@ def show_view_schedule_page():
             help="Select an employee to filter the schedule, or 'All Employees' to include everyone"
         )
         
-        # Generate color mapping for employees
-        
-        # Prepare PDF data
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#1f4e79'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        # Filter shifts by selected employee
-        shifts_to_export = schedule.shifts
-        if selected_employee_export and selected_employee_export != "All Employees":
-            shifts_to_export = [s for s in schedule.shifts if s.employee_name == selected_employee_export]
-        
-        # Title
-        month_name = datetime(schedule.year, schedule.month, 1).strftime("%B %Y")
-        if selected_employee_export and selected_employee_export != "All Employees":
-            title_text = f"Employee Schedule - {selected_employee_export} - {month_name}"
-        else:
-            title_text = f"Employee Schedule - {month_name}"
-        title = Paragraph(title_text, title_style)
-        elements.append(title)
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Get unique employees from shifts and assign colors
-        unique_employees = sorted(set(s.employee_name for s in shifts_to_export))
-        employee_colors = get_employee_colors(unique_employees)
-        
-        # Add legend at the top if showing all employees
-        if selected_employee_export == "All Employees" and unique_employees:
-            legend_style = ParagraphStyle(
-                'LegendStyle',
-                parent=styles['Normal'],
-                fontSize=10,
-                textColor=colors.HexColor('#1f4e79'),
-                spaceAfter=10,
-                alignment=TA_LEFT
-            )
-            legend_title = Paragraph("<b>Employee Color Legend:</b>", legend_style)
-            elements.append(legend_title)
-            
-            # Create legend table
-            legend_data = [["Employee", "Color"]]
-            for emp in unique_employees:
-                legend_data.append([emp, ""])  # Color will be shown via background
-            
-            legend_table = Table(legend_data, colWidths=[2*inch, 0.5*inch])
-            legend_style_list = [
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-            ]
-            
-            # Add background colors to legend rows
-            for i, emp in enumerate(unique_employees, start=1):
-                legend_style_list.append(('BACKGROUND', (1, i), (1, i), colors.HexColor(employee_colors[emp])))
-            
-            legend_table.setStyle(TableStyle(legend_style_list))
-            elements.append(legend_table)
-            elements.append(Spacer(1, 0.3*inch))
-        
-        # Group shifts by date
-        shifts_by_date = {}
-        for shift in sorted(shifts_to_export, key=lambda x: (x.date or datetime.min, x.start_time)):
-            if shift.date:
-                date_key = shift.date.strftime("%Y-%m-%d")
-                if date_key not in shifts_by_date:
-                    shifts_by_date[date_key] = []
-                shifts_by_date[date_key].append(shift)
-        
-        # Create table data
-        table_data = [["Date", "Day", "Employee", "Start Time", "End Time", "Duration (hrs)"]]
-        row_colors = []  # Track which employee color to use for each row
-        
-        for date_key in sorted(shifts_by_date.keys()):
-            date_obj = datetime.strptime(date_key, "%Y-%m-%d")
-            for shift in shifts_by_date[date_key]:
-                table_data.append([
-                    date_obj.strftime("%Y-%m-%d"),
-                    shift.day.name if shift.day else "",
-                    shift.employee_name,
-                    shift.start_time.strftime("%I:%M %p"),
-                    shift.end_time.strftime("%I:%M %p"),
-                    f"{shift.duration_hours():.2f}"
-                ])
-                row_colors.append(employee_colors.get(shift.employee_name, colors.white))
-        
-        # Create table
-        table = Table(table_data, colWidths=[1.2*inch, 0.8*inch, 1.5*inch, 1*inch, 1*inch, 1*inch])
-        
-        # Build table style with color coding
-        table_style = [
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ]
-        
-        # Add background colors and text colors for each row based on employee
-        for i, row_color in enumerate(row_colors, start=1):
-            table_style.append(('BACKGROUND', (0, i), (-1, i), colors.HexColor(row_color)))
-            # Use white text for dark backgrounds, black for light backgrounds
-            text_color = colors.white if is_dark_color(row_color) else colors.black
-            table_style.append(('TEXTCOLOR', (0, i), (-1, i), text_color))
-        
-        table.setStyle(TableStyle(table_style))
-        
-        elements.append(table)
-        
-        # Build PDF
-        doc.build(elements)
-        pdf_data = buffer.getvalue()
-        buffer.close()
+        pdf_data = get_schedule_pdf(schedule, selected_employee_export)
         
         # Generate filename
         if selected_employee_export and selected_employee_export != "All Employees":
@@ -1,12 +1,59 @@
 """
 Core scheduling algorithm for generating employee shift schedules.
 """
-from typing import List, Dict
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
 from datetime import datetime, time, timedelta
+from functools import lru_cache
 from models import (
-    Employee, StoreHours, Shift, Schedule, DayOfWeek
+    Employee, StoreHours, Shift, Schedule, DayOfWeek,
+    check_availability_seconds, can_start_at_seconds
 )
 
+_US_PER_SECOND = 10 ** 6
+_US_PER_DAY = 24 * 3600 * _US_PER_SECOND
+_ONE_US = timedelta(microseconds=1)
+_TICK_US = 15 * 60 * _US_PER_SECOND  # the clock advances in 15-minute steps when no shift fits
+
+
+@lru_cache(maxsize=1024)
+def _hours_to_us(hours: float) -> int:
+    """Convert a duration in hours to whole microseconds, rounded exactly as timedelta rounds it."""
+    return timedelta(hours=hours) // _ONE_US
+
+
+def _time_to_us(time_obj: time) -> int:
+    """Convert a time of day to microseconds since midnight."""
+    return ((time_obj.hour * 60 + time_obj.minute) * 60 + time_obj.second) * _US_PER_SECOND + time_obj.microsecond
+
+
+def _us_to_time(us: int) -> time:
+    """Convert microseconds since midnight, possibly past the next midnight, back to a time of day."""
+    seconds, microsecond = divmod(us % _US_PER_DAY, _US_PER_SECOND)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return time(hour, minute, second, microsecond)
+
+
+@lru_cache(maxsize=32)
+def _month_calendar(year: int, month: int) -> Tuple[Tuple[datetime, DayOfWeek], ...]:
+    """Get (date, day of week) for every date in a month; both are immutable, so the tuple is shared."""
+    days = []
+    current_date = datetime(year, month, 1)
+    
+    while current_date.month == month:
+        days.append((current_date, DayOfWeek(current_date.weekday())))
+        current_date += timedelta(days=1)
+    
+    return tuple(days)
+
+
+def _generate_month(job: Tuple[List[Employee], StoreHours, int, int]) -> Schedule:
+    """Worker-process entry point for ShiftScheduler.generate_schedules."""
+    employees, store_hours, year, month = job
+    return ShiftScheduler(employees, store_hours).generate_schedule(year, month)
+
 
 class ShiftScheduler:
     """Generates shift schedules based on constraints and preferences."""
@@ -28,46 +75,79 @@ class ShiftScheduler:
         """
         schedule = Schedule(month=month, year=year)
         
-        # Get all dates in the month
-        dates = self._get_dates_in_month(year, month)
+        # Get all dates in the month, with their day of week
+        month_days = _month_calendar(year, month)
         
-        # Track hours worked per employee
-        employee_hours: Dict[str, float] = {emp.name: 0.0 for emp in self.employees}
+        # Track hours worked per employee, indexed by position in self.employees
+        employee_hours: List[float] = [0.0] * len(self.employees)
+        
+        # Only the overrides that fall inside this month are relevant
+        month_overrides = self.store_hours.get_overrides_in_range(month_days[0][0], month_days[-1][0])
+        
+        # Regular hours only vary by weekday, so look each one up once
+        weekday_hours = tuple(self.store_hours.get_hours_for_day(day) for day in DayOfWeek)
+        
+        # Who can work each day of the week only depends on unavailable_days, so
+        # resolve it once for the whole month
+        indices_by_day = self._build_day_avail_table()
         
         # Generate shifts for each day
-        for date in dates:
-            day_of_week = DayOfWeek(date.weekday())
-            
+        for date, day_of_week in month_days:
             # Skip if store is closed (check date override first, then day of week)
-            if not self.store_hours.is_open(day_of_week, date):
-                continue
-            
-            hours = self.store_hours.get_hours(day_of_week, date)
+            date_only = date.date()
+            if month_overrides and date_only in month_overrides:
+                hours = month_overrides[date_only]
+            else:
+                hours = weekday_hours[day_of_week]
             if hours is None:
                 continue
             open_time, close_time = hours
             
             # Generate shifts for this day
             day_shifts = self._generate_shifts_for_day(
-                day_of_week, date, open_time, close_time, employee_hours
+                day_of_week, date, open_time, close_time, employee_hours,
+                indices_by_day[day_of_week]
             )
             
             # Add shifts to schedule (hours are already tracked in _generate_shifts_for_day)
-            for shift in day_shifts:
-                schedule.add_shift(shift)
+            schedule.extend_shifts(day_shifts)
         
         return schedule
     
-    def _get_dates_in_month(self, year: int, month: int) -> List[datetime]:
-        """Get all dates in a given month."""
-        dates = []
-        current_date = datetime(year, month, 1)
+    def generate_schedules(self, year: int, months: Sequence[int], max_workers: Optional[int] = None) -> List[Schedule]:
+        """
+        Generate schedules for several months of a year, in parallel worker processes.
         
-        while current_date.month == month:
-            dates.append(current_date)
-            current_date += timedelta(days=1)
+        Months are scheduled independently (hour totals restart each month), so the
+        result matches calling generate_schedule for each month in turn.
+        
+        Args:
+            year: Year for the schedules
+            months: Months (1-12) to schedule, in the order the schedules are returned
+            max_workers: Worker process limit (defaults to one per month, up to the CPU count)
+            
+        Returns:
+            One Schedule per month
+        """
+        months = list(months)
+        if len(months) <= 1:
+            return [self.generate_schedule(year, month) for month in months]
         
-        return dates
+        workers = max_workers or min(len(months), os.cpu_count() or 1)
+        jobs = [(self.employees, self.store_hours, year, month) for month in months]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_generate_month, jobs))
+    
+    def _build_day_avail_table(self) -> Tuple[Tuple[int, ...], ...]:
+        """Get the positions in self.employees of who can work each day, as a 7-entry tuple indexed by day."""
+        return tuple(
+            tuple(i for i, emp in enumerate(self.employees) if emp.can_work(day))
+            for day in DayOfWeek
+        )
+    
+    def _get_dates_in_month(self, year: int, month: int) -> List[datetime]:
+        """Get all dates in a given month."""
+        return [date for date, _ in _month_calendar(year, month)]
     
     def _generate_shifts_for_day(
         self,
@@ -75,11 +155,23 @@ class ShiftScheduler:
         date: datetime,
         open_time: time,
         close_time: time,
-        employee_hours: Dict[str, float]
+        employee_hours: List[float],
+        day_indices: Optional[Sequence[int]] = None
     ) -> List[Shift]:
-        """Generate shifts for a single day."""
+        """
+        Generate shifts for a single day.
+        
+        employee_hours holds each employee's hours so far, indexed by position in
+        self.employees, and is updated in place. day_indices are the positions of the
+        employees who can work this day.
+        """
         shifts = []
         
+        # Employees who can work this day of week, in roster order
+        if day_indices is None:
+            day_indices = [i for i, emp in enumerate(self.employees) if emp.can_work(day)]
+        day_employees = [self.employees[i] for i in day_indices]
+        
         # Get the date part (handle both date and datetime objects)
         if isinstance(date, datetime):
             date_only = date.date()
@@ -94,12 +186,31 @@ class ShiftScheduler:
         
         total_hours = (close_dt - open_dt).total_seconds() / 3600.0
         
+        # The day's employee state as parallel tuples indexed by position in
+        # day_employees; the loop below filters and sorts those plain indices, and
+        # day_indices[k] maps one back to its slot in employee_hours
+        names = tuple(emp.name for emp in day_employees)
+        max_hours = tuple(emp.max_hours_per_month for emp in day_employees)
+        min_shift = tuple(emp.min_hours_per_shift for emp in day_employees)
+        roster = range(len(day_employees))
+        
+        # Resolve each employee's availability rule for this date once; candidate
+        # shifts below are checked against it with plain int comparisons
+        availability = tuple(emp.availability_rule(day, date) for emp in day_employees)
+        
+        # Preference doesn't change during the day either, so the primary sort key
+        # is resolved once instead of on every re-sort
+        not_preferred = tuple(not emp.prefers_day(day, date) for emp in day_employees)
+        
+        def priority(k):
+            # Preferred first, then whoever has worked the smallest share of their max hours
+            return (not_preferred[k], employee_hours[day_indices[k]] / max_hours[k])
+        
         # Get available employees for this day (basic check)
         # Store this outside the loop for fallback use
         initial_available_employees = [
-            emp for emp in self.employees
-            if emp.can_work(day) and 
-            employee_hours[emp.name] < emp.max_hours_per_month
+            k for k in roster
+            if employee_hours[day_indices[k]] < max_hours[k]
         ]
         
         if not initial_available_employees:
@@ -108,12 +219,7 @@ class ShiftScheduler:
         available_employees = initial_available_employees
         
         # Sort employees by preference and hours worked (prioritize those who need hours)
-        available_employees.sort(
-            key=lambda e: (
-                not e.prefers_day(day, date),
-                employee_hours[e.name] / e.max_hours_per_month
-            )
-        )
+        available_employees.sort(key=priority)
         
         # Determine shift duration based on total hours
         # If <= 6 hours: 1 person, if > 6 hours: split among minimum people (at least 2)
@@ -128,42 +234,45 @@ class ShiftScheduler:
             shift_duration = total_hours / num_people
         
         # Generate shifts to cover the day
-        # Use datetime for reliable time comparisons (handles midnight crossing)
-        current_dt = open_dt
+        # The clock runs in integer microseconds since midnight of this date, so close
+        # may pass 86400 s when the store closes after midnight; times of day are only
+        # built for the shifts that are actually created
+        open_us = _time_to_us(open_time)
+        close_us = open_us + (close_dt - open_dt) // _ONE_US
+        current_us = open_us
         
         max_iterations = 1000
         iteration = 0
-        last_current_dt = None
+        last_current_us = None
+        # The filter and sort only depend on employee_hours, which changes only when a
+        # shift is created, so ticks that just advance the clock reuse the last order
+        dirty = False
         
-        while current_dt < close_dt and iteration < max_iterations:
+        while current_us < close_us and iteration < max_iterations:
             iteration += 1
             
-            # Re-filter available employees (in case they've hit max hours)
-            available_employees = [
-                emp for emp in self.employees
-                if emp.can_work(day) and 
-                employee_hours[emp.name] < emp.max_hours_per_month
-            ]
-            
-            if not available_employees:
-                # No employees available (all hit max hours), break
-                break
-            
-            # Re-sort employees by preference and hours worked
-            available_employees.sort(
-                key=lambda e: (
-                    not e.prefers_day(day, date),
-                    employee_hours[e.name] / e.max_hours_per_month
-                )
-            )
+            if dirty:
+                # Re-filter available employees (in case they've hit max hours)
+                available_employees = [
+                    k for k in roster
+                    if employee_hours[day_indices[k]] < max_hours[k]
+                ]
+                
+                if not available_employees:
+                    # No employees available (all hit max hours), break
+                    break
+                
+                # Re-sort employees by preference and hours worked
+                available_employees.sort(key=priority)
+                dirty = False
             
             # Reset employee index when re-filtering (employee list may have changed)
             employee_index = 0
             
             # Calculate remaining time in the day
-            remaining_time = (close_dt - current_dt).total_seconds() / 3600.0
+            remaining_time = (close_us - current_us) / _US_PER_SECOND / 3600.0
             
-            min_shift_duration = min(emp.min_hours_per_shift for emp in available_employees) if available_employees else 0
+            min_shift_duration = min(min_shift[k] for k in available_employees) if available_employees else 0
             if remaining_time < min_shift_duration:
                 if len(shifts) > 0 or remaining_time < 0.25:
                     break
@@ -173,53 +282,63 @@ class ShiftScheduler:
             shift_created = False
             
             while attempts < len(available_employees) and not shift_created:
-                emp = available_employees[employee_index % len(available_employees)]
+                k = available_employees[employee_index % len(available_employees)]
+                emp_name = names[k]
+                emp_min_shift = min_shift[k]
                 
                 # Calculate potential shift duration for this employee
-                remaining_hours = emp.max_hours_per_month - employee_hours[emp.name]
+                remaining_hours = max_hours[k] - employee_hours[day_indices[k]]
                 
-                # Try different shift durations, starting with ideal and working down
-                potential_durations = sorted(set([
-                    min(shift_duration, remaining_hours, remaining_time),
-                    min(remaining_hours, remaining_time),
-                    remaining_time
-                ]), reverse=True)
+                # Try different shift durations, starting with ideal and working down.
+                # capped <= fitted <= remaining_time already, so only equal neighbours
+                # need dropping to get the distinct values in descending order
+                fitted = min(remaining_hours, remaining_time)
+                capped = min(shift_duration, fitted)
+                if fitted == remaining_time:
+                    potential_durations = (remaining_time,) if capped == fitted else (remaining_time, capped)
+                elif capped == fitted:
+                    potential_durations = (remaining_time, fitted)
+                else:
+                    potential_durations = (remaining_time, fitted, capped)
                 
                 for actual_shift_duration in potential_durations:
                     allow_short_shift = (
                         len(shifts) == 0 and (
                             actual_shift_duration >= remaining_time * 0.8 or
-                            remaining_time < emp.min_hours_per_shift
+                            remaining_time < emp_min_shift
                         )
                     )
                     
-                    if actual_shift_duration < emp.min_hours_per_shift and not allow_short_shift:
+                    if actual_shift_duration < emp_min_shift and not allow_short_shift:
                         continue
                     if allow_short_shift and actual_shift_duration < 1.0:
                         continue
                     
-                    end_dt = current_dt + timedelta(hours=actual_shift_duration)
-                    if end_dt > close_dt:
-                        end_dt = close_dt
-                        actual_shift_duration = (end_dt - current_dt).total_seconds() / 3600.0
-                        if actual_shift_duration < emp.min_hours_per_shift:
+                    end_us = current_us + _hours_to_us(actual_shift_duration)
+                    if end_us > close_us:
+                        end_us = close_us
+                        actual_shift_duration = (end_us - current_us) / _US_PER_SECOND / 3600.0
+                        if actual_shift_duration < emp_min_shift:
                             continue
                     
-                    if emp.is_available_at_time(day, current_dt.time(), end_dt.time(), date):
+                    if check_availability_seconds(availability[k],
+                                                  current_us // _US_PER_SECOND % 86400,
+                                                  end_us // _US_PER_SECOND % 86400):
                         shift = Shift(
-                            employee_name=emp.name,
+                            employee_name=emp_name,
                             day=day,
-                            start_time=current_dt.time(),
-                            end_time=end_dt.time(),
+                            start_time=_us_to_time(current_us),
+                            end_time=_us_to_time(end_us),
                             date=date
                         )
                         
                         shifts.append(shift)
-                        employee_hours[emp.name] += shift.duration_hours()
+                        employee_hours[day_indices[k]] += shift.duration_hours()
                         
-                        current_dt = end_dt
+                        current_us = end_us
                         employee_index += 1
                         shift_created = True
+                        dirty = True
                         break  # Found a working shift, exit the duration loop
                 
                 if not shift_created:
@@ -229,63 +348,75 @@ class ShiftScheduler:
             if not shift_created:
                 if len(shifts) == 0:
                     # Try minimal shift duration as last resort
-                    for emp in available_employees:
-                        min_duration = emp.min_hours_per_shift
+                    for k in available_employees:
+                        min_duration = min_shift[k]
                         if remaining_time >= min_duration:
-                            end_dt = min(current_dt + timedelta(hours=min_duration), close_dt)
-                            if emp.is_available_at_time(day, current_dt.time(), end_dt.time(), date):
+                            end_us = min(current_us + _hours_to_us(min_duration), close_us)
+                            if check_availability_seconds(availability[k],
+                                                          current_us // _US_PER_SECOND % 86400,
+                                                          end_us // _US_PER_SECOND % 86400):
                                 shift = Shift(
-                                    employee_name=emp.name,
+                                    employee_name=names[k],
                                     day=day,
-                                    start_time=current_dt.time(),
-                                    end_time=end_dt.time(),
+                                    start_time=_us_to_time(current_us),
+                                    end_time=_us_to_time(end_us),
                                     date=date
                                 )
                                 shifts.append(shift)
-                                employee_hours[emp.name] += shift.duration_hours()
-                                current_dt = end_dt
+                                employee_hours[day_indices[k]] += shift.duration_hours()
+                                current_us = end_us
                                 shift_created = True
+                                dirty = True
                                 break
                 
                 if not shift_created:
-                    next_dt = current_dt + timedelta(minutes=15)
-                    if last_current_dt == current_dt or next_dt >= close_dt:
+                    next_us = current_us + _TICK_US
+                    if last_current_us == current_us or next_us >= close_us:
+                        break
+                    # Ticks where no candidate can start at all would fail the same way
+                    # (nothing else changes until a shift is created), so jump past them;
+                    # they still count toward max_iterations
+                    while not any(can_start_at_seconds(availability[k], next_us // _US_PER_SECOND % 86400)
+                                  for k in available_employees):
+                        next_us += _TICK_US
+                        iteration += 1
+                        if next_us >= close_us or iteration >= max_iterations:
+                            break
+                    if next_us >= close_us:
                         break
-                    last_current_dt = current_dt
-                    current_dt = next_dt
+                    last_current_us = current_us
+                    current_us = next_us
                     employee_index = 0
         
         # Fallback: If no shifts were created, try simple approach
         if len(shifts) == 0:
-            date_only = date.date() if isinstance(date, datetime) else date
+            # day_employees already holds the roster filtered by can_work(day), which
+            # is the unavailable_days check, in roster order
             available_fallback = [
-                emp for emp in self.employees
-                if emp.can_work(day) and
-                day not in emp.unavailable_days and
-                not (hasattr(emp, 'unavailable_dates') and 
-                     date_only in emp.unavailable_dates and
-                     date_only not in getattr(emp, 'unavailable_times_by_date', {}))
+                k for k, emp in enumerate(day_employees)
+                if not (date_only in emp.unavailable_dates and
+                        date_only not in emp.unavailable_times_by_date)
             ]
             
             if available_fallback:
                 total_hours_available = (close_dt - open_dt).total_seconds() / 3600.0
                 if total_hours_available > 0:
-                    emp = available_fallback[0]
-                    remaining_hours = emp.max_hours_per_month - employee_hours.get(emp.name, 0)
+                    k = available_fallback[0]
+                    remaining_hours = max_hours[k] - employee_hours[day_indices[k]]
                     shift_duration = min(total_hours_available, max(remaining_hours, 1.0), 8.0)
                     shift_duration = max(shift_duration, 1.0) if total_hours_available >= 1.0 else shift_duration
                     
                     if shift_duration > 0:
                         end_dt = min(open_dt + timedelta(hours=shift_duration), close_dt)
                         shift = Shift(
-                            employee_name=emp.name,
+                            employee_name=names[k],
                             day=day,
                             start_time=open_time,
                             end_time=end_dt.time(),
                             date=date
                         )
                         shifts.append(shift)
-                        employee_hours[emp.name] = employee_hours.get(emp.name, 0) + shift.duration_hours()
+                        employee_hours[day_indices[k]] += shift.duration_hours()
         
         return shifts
     